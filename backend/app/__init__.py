@@ -3,11 +3,14 @@
 from pathlib import Path
 
 import connexion
-from flask_compress import Compress
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
+from app.compression import CachingCompress
+from app.json_provider import JSONProvider
 from app.logging_config import init_logging, request_logging
+from app.openapi_spec import api_spec
+from app.validation import VALIDATOR_MAP
 
 # Backend root (parent of app/)
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,13 +25,15 @@ def create_app():
     # Paths in spec are full (/api/...) so no base_path
     # Security: Connexion validates via app.security.bearer_auth (dummy passthrough)
     # Actual JWT validation done by Flask-JWT-Extended @jwt_required() decorators
-    cnx.add_api(
-        "openapi.yaml",
-        arguments={"title": "Weather App API"},
-        strict_validation=True,
-    )
+    # Spec dict from api/openapi.cache.json while it is current, already validated
+    # (scripts/build_openapi_cache.py)
+    # Query/path parameters checked by app.validation (schemas compiled once)
+    with api_spec(BASE_DIR / "api") as spec:
+        cnx.add_api(spec, strict_validation=True, validator_map=VALIDATOR_MAP)
 
     flask_app = cnx.app
+    # orjson-backed (stdlib fallback); writes datetimes from to_dict() as isoformat()
+    flask_app.json = JSONProvider(flask_app)
     from config import get_config
 
     flask_app.config.from_object(get_config())
@@ -40,7 +45,7 @@ def create_app():
         expose_headers=["Content-Type"],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     )
-    JWTManager(flask_app)
+    jwt = JWTManager(flask_app)
 
     if flask_app.config.get("RATELIMIT_ENABLED") and flask_app.config.get(
         "RATELIMIT_DEFAULT"
@@ -50,12 +55,21 @@ def create_app():
 
         # Use Redis for rate limiting storage if configured, otherwise fall back to in-memory
         storage_uri = flask_app.config.get("RATELIMIT_STORAGE_URL") or None
+        storage_options = {}
+        if storage_uri and storage_uri.startswith("hybrid+"):
+            # Registers the hybrid+redis / hybrid+memory schemes with limits
+            from app import ratelimit as _ratelimit  # noqa: F401
+
+            storage_options["sync_interval"] = flask_app.config[
+                "RATELIMIT_SYNC_SECONDS"
+            ]
 
         limiter = Limiter(
             key_func=get_remote_address,
             app=flask_app,
             default_limits=[flask_app.config["RATELIMIT_DEFAULT"]],
             storage_uri=storage_uri,
+            storage_options=storage_options,
         )
         flask_app.extensions["limiter"] = limiter
         # Stricter rate limit for auth endpoints (login/register) to reduce enumeration
@@ -71,11 +85,25 @@ def create_app():
 
     request_logging(flask_app)
     add_security_headers(flask_app)
-    Compress(flask_app)
+    CachingCompress(flask_app)
 
+    from app.cache import init_cache
+    from app.db_pool import init_pool
+    from app.db_routing import init_routing
     from app.extensions import db
 
+    init_pool(flask_app)
     db.init_app(flask_app)
+    init_routing(flask_app)
+    init_cache(flask_app)
+    # Shared memory for the upstream budget: created here so forked workers share it
+    from app.weather.quota import init_quota
+
+    init_quota(flask_app)
+
+    from app.auth.revocation import init_revocation
+
+    init_revocation(jwt)
 
     # Import app modules so models are bound to db.metadata (Alembic + Flask-SQLAlchemy)
     from app.auth import models as _auth_models  # noqa: F401
@@ -87,6 +115,28 @@ def create_app():
     return cnx
 
 
+def reset_after_fork(flask_app):
+    """
+    Drop per-process state a worker inherits from a preloading master (gunicorn
+    post_fork): pooled DB connections, Redis clients, caches, executor threads and
+    log handlers. Modules that check os.getpid() (hashing, revocation, rate limit
+    sync) recreate their own state on first use.
+    """
+    from app import background, cache, events, logging_config
+    from app.extensions import db
+    from app.weather import service as weather_service
+
+    logging_config.reset_after_fork()
+    with flask_app.app_context():
+        # close=False: leave the parent's sockets alone, just stop using them here
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    cache.reset_after_fork(flask_app)
+    background.reset_after_fork()
+    events.reset_after_fork()
+    weather_service.reset_after_fork()
+
+
 def add_security_headers(flask_app):
     """Add common security headers (X-Content-Type-Options, X-Frame-Options)."""
 
@@ -0,0 +1,105 @@
+"""Auth: bcrypt hashing/verification off the request thread, under its own budget.
+
+Hashes run in a small process pool (AUTH_HASH_WORKERS per gunicorn worker; 0 runs them
+inline). At most AUTH_MAX_PENDING hash operations may be in flight or queued per
+worker: beyond that, callers wait up to AUTH_QUEUE_WAIT_SECONDS for a slot and then
+get AuthBusyError, so a login burst queues inside that budget instead of tying up
+every request thread. A slot is freed when its hash finishes, not when the caller
+stops waiting for it.
+"""
+
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import bcrypt
+from flask import current_app, has_app_context
+
+DEFAULT_ROUNDS = 12
+
+_pool = None  # ProcessPoolExecutor, imported on first use
+_pool_pid: int | None = None
+_slots: threading.BoundedSemaphore | None = None
+_lock = threading.Lock()
+
+
+class AuthBusyError(Exception):
+    """Auth hashing budget exhausted; the caller should retry later."""
+
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def _config(key: str, default):
+    if has_app_context():
+        value = current_app.config.get(key)
+        if value is not None:
+            return value
+    return default
+
+
+def _get_pool(workers: int, max_pending: int):
+    """Per-process pool (recreated after fork: pools do not survive it)."""
+    global _pool, _pool_pid, _slots
+    if _pool is None or _pool_pid != os.getpid():
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with _lock:
+            if _pool is None or _pool_pid != os.getpid():
+                # forkserver: children start from a clean process, not a threaded one
+                _pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+                _pool_pid = os.getpid()
+                _slots = threading.BoundedSemaphore(max_pending)
+    return _pool
+
+
+def _run(fn, *args):
+    workers = _config("AUTH_HASH_WORKERS", 0)
+    if workers <= 0:
+        return fn(*args)
+    pool = _get_pool(workers, _config("AUTH_MAX_PENDING", 8))
+    slots = _slots
+    if not slots.acquire(timeout=_config("AUTH_QUEUE_WAIT_SECONDS", 2)):
+        raise AuthBusyError("Authentication is busy. Please retry shortly.")
+    try:
+        future = pool.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    # Released on completion (or cancel): a timed-out hash still occupies a worker
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=_config("AUTH_HASH_TIMEOUT_SECONDS", 10))
+    except FutureTimeoutError:
+        future.cancel()
+        raise AuthBusyError("Authentication is busy. Please retry shortly.")
+
+
+def configured_rounds() -> int:
+    """bcrypt work factor for new hashes (BCRYPT_ROUNDS)."""
+    return int(_config("BCRYPT_ROUNDS", DEFAULT_ROUNDS))
+
+
+def hash_password(password: str) -> str:
+    return _run(_hashpw, password.encode("utf-8"), configured_rounds()).decode("utf-8")
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return _run(_checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True if hashed was made with a different work factor than configured now."""
+    try:
+        return int(hashed.split("$")[2]) != configured_rounds()
+    except (IndexError, ValueError):
+        return True
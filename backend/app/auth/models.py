@@ -1,8 +1,9 @@
 """Auth: User model."""
 from datetime import datetime
 
-import bcrypt
+from sqlalchemy import event, inspect
 
+from app.auth import hashing, profiles
 from app.extensions import db
 
 
@@ -15,6 +16,8 @@ class User(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # End of the POST /api/zones/refresh cooldown (app/zones/service.py)
+    zones_refresh_until = db.Column(db.DateTime, nullable=True)
 
     weather_zones = db.relationship(
         "WeatherZone",
@@ -24,14 +27,14 @@ class User(db.Model):
     )
 
     def set_password(self, password: str) -> None:
-        self.password_hash = bcrypt.hashpw(
-            password.encode("utf-8"), bcrypt.gensalt()
-        ).decode("utf-8")
+        self.password_hash = hashing.hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return bcrypt.checkpw(
-            password.encode("utf-8"), self.password_hash.encode("utf-8")
-        )
+        return hashing.verify_password(password, self.password_hash)
+
+    def password_needs_rehash(self) -> bool:
+        """True when the stored hash uses a different bcrypt cost than configured."""
+        return hashing.needs_rehash(self.password_hash)
 
     def to_dict(self):
         return {
@@ -40,3 +43,26 @@ class User(db.Model):
             "email": self.email,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+class RevokedToken(db.Model):
+    """Access token revoked before expiry (logout). Rows are purged once expired."""
+
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    revoked_at = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_profile(mapper, connection, target: User) -> None:
+    """Drop cached /me profiles when profile fields change (not on password rehash)."""
+    state = inspect(target)
+    if any(
+        state.attrs[field].history.has_changes() for field in profiles.PROFILE_FIELDS
+    ):
+        profiles.invalidate(target.id)
@@ -0,0 +1,61 @@
+"""Auth: cached user profiles for /api/auth/me (token claims + per-process TTL cache).
+
+Access tokens carry the stable profile fields as claims. A profile change records a
+marker in the shared cache (for the token lifetime) so tokens issued before it stop
+being trusted, and drops this process's cached copy; other workers' copies expire
+after PROFILE_CACHE_TTL_SECONDS.
+"""
+
+import time
+
+from flask import current_app
+
+from app.cache import get_local_cache, get_shared_cache
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_FIELDS = ("username", "email", "created_at")
+
+
+def claims_for(profile: dict) -> dict:
+    """Additional JWT claims for a User.to_dict() profile."""
+    claims = {field: profile.get(field) for field in PROFILE_FIELDS}
+    # Unix time; a naive utcnow().timestamp() would be off by the host's UTC offset
+    claims["profile_at"] = time.time()
+    return claims
+
+
+def from_claims(user_id: int, claims: dict) -> dict | None:
+    """Profile from token claims, unless missing or older than the last change."""
+    if not all(field in claims for field in PROFILE_FIELDS):
+        return None
+    try:
+        changed_at = get_shared_cache().get(f"profile:changed:{user_id}")
+    except Exception:
+        logger.warning("profile change marker lookup failed", exc_info=True)
+        return None
+    if changed_at is not None and float(changed_at) >= float(claims["profile_at"]):
+        return None
+    profile = {"id": user_id}
+    profile.update((field, claims[field]) for field in PROFILE_FIELDS)
+    return profile
+
+
+def get_cached(user_id: int) -> dict | None:
+    return get_local_cache("user_profiles").get(str(user_id))
+
+
+def store(user_id: int, profile: dict) -> None:
+    ttl = current_app.config.get("PROFILE_CACHE_TTL_SECONDS") or 60
+    get_local_cache("user_profiles").set(str(user_id), profile, ttl)
+
+
+def invalidate(user_id: int) -> None:
+    """Forget cached profiles of user_id and distrust tokens issued before now."""
+    get_local_cache("user_profiles").delete(str(user_id))
+    ttl = current_app.config.get("JWT_ACCESS_TOKEN_EXPIRES") or 900
+    try:
+        get_shared_cache().set(f"profile:changed:{user_id}", time.time(), ttl)
+    except Exception:
+        logger.warning("profile change marker write failed", exc_info=True)
@@ -0,0 +1,150 @@
+"""Auth: access-token revocation (logout) with O(1) per-request checks.
+
+Revoked jtis are stored in revoked_tokens, and in the shared cache with a TTL equal to
+the token's remaining lifetime. Each worker mirrors unexpired revocations in an
+in-memory set, refreshed by a background thread every REVOCATION_SYNC_SECONDS, so the
+per-request check is a set lookup. Only hits are confirmed against the store. A
+logout on another worker takes effect here within one sync interval.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.auth.models import RevokedToken
+from app.cache import get_shared_cache
+from app.extensions import db
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Re-read revocations this far behind the last one seen (clock skew, slow commits)
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class _LocalRevocations:
+    """This process's view of unexpired revoked jtis (jti -> expiry timestamp)."""
+
+    def __init__(self):
+        self.jtis: dict[str, float] = {}
+        self.cursor: datetime | None = None
+        self.lock = threading.Lock()
+
+    def add(self, jti: str, exp: float) -> None:
+        with self.lock:
+            self.jtis[jti] = exp
+
+    def might_contain(self, jti: str) -> bool:
+        return jti in self.jtis
+
+    def sync(self) -> None:
+        """Pull revocations made since the last sync (any worker) and drop expired."""
+        now = datetime.utcnow()
+        q = db.session.query(
+            RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at
+        ).filter(RevokedToken.expires_at > now)
+        if self.cursor is not None:
+            q = q.filter(RevokedToken.revoked_at > self.cursor - SYNC_OVERLAP)
+        rows = q.all()
+        now_ts = time.time()
+        with self.lock:
+            for jti, expires_at, revoked_at in rows:
+                self.jtis[jti] = _timestamp(expires_at)
+                if self.cursor is None or revoked_at > self.cursor:
+                    self.cursor = revoked_at
+            if self.cursor is None:
+                self.cursor = now
+            for jti in [j for j, exp in self.jtis.items() if exp <= now_ts]:
+                del self.jtis[jti]
+
+
+_local: _LocalRevocations | None = None
+_local_pid: int | None = None
+_lock = threading.Lock()
+
+
+def _timestamp(naive_utc: datetime) -> float:
+    return (naive_utc - datetime(1970, 1, 1)).total_seconds()
+
+
+def _sync_loop(app, local: _LocalRevocations, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            with app.app_context():
+                local.sync()
+                db.session.remove()
+        except Exception:
+            logger.warning("revocation sync failed", exc_info=True)
+
+
+def _get_local() -> _LocalRevocations:
+    """Per-process revocation set: loaded on first use (and again after fork)."""
+    global _local, _local_pid
+    if _local is None or _local_pid != os.getpid():
+        with _lock:
+            if _local is None or _local_pid != os.getpid():
+                local = _LocalRevocations()
+                local.sync()
+                interval = current_app.config.get("REVOCATION_SYNC_SECONDS") or 0
+                if interval > 0:
+                    threading.Thread(
+                        target=_sync_loop,
+                        args=(current_app._get_current_object(), local, interval),
+                        daemon=True,
+                        name="revocation-sync",
+                    ).start()
+                _local, _local_pid = local, os.getpid()
+    return _local
+
+
+def revoke(jti: str, user_id: int | None, exp: float) -> None:
+    """Revoke a token until its expiry timestamp exp."""
+    expires_at = datetime.utcfromtimestamp(exp)
+    now = datetime.utcnow()
+    if db.session.get(RevokedToken, jti) is None:
+        db.session.add(
+            RevokedToken(
+                jti=jti, user_id=user_id, revoked_at=now, expires_at=expires_at
+            )
+        )
+    # Logouts are rare: piggyback the purge of expired entries on them
+    db.session.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    ttl = exp - time.time()
+    if ttl > 0:
+        try:
+            get_shared_cache().set(f"revoked:{jti}", 1, ttl)
+        except Exception:
+            logger.warning("revocation cache write failed", exc_info=True)
+    _get_local().add(jti, exp)
+
+
+def is_revoked(jti: str) -> bool:
+    """Per-request check: set lookup; only possible positives hit the store."""
+    if not _get_local().might_contain(jti):
+        return False
+    try:
+        if get_shared_cache().get(f"revoked:{jti}") is not None:
+            return True
+    except Exception:
+        logger.warning("revocation cache read failed", exc_info=True)
+    row = db.session.get(RevokedToken, jti)
+    return row is not None and row.expires_at > datetime.utcnow()
+
+
+def init_revocation(jwt_manager) -> None:
+    """Wire the revocation list into Flask-JWT-Extended."""
+
+    @jwt_manager.token_in_blocklist_loader
+    def _token_in_blocklist(jwt_header, jwt_payload) -> bool:
+        return is_revoked(jwt_payload["jti"])
+
+    @jwt_manager.revoked_token_loader
+    def _revoked_token(jwt_header, jwt_payload):
+        return {"code": "unauthorized", "message": "Token has been revoked"}, 401
@@ -2,6 +2,9 @@
 
 import re
 
+from sqlalchemy import or_
+
+from app.auth import profiles
 from app.auth.models import User
 from app.extensions import db
 
@@ -96,7 +99,38 @@ def get_user_by_email(email: str) -> User | None:
 
 def authenticate_user(login: str, password: str) -> User | None:
     """login can be username or email."""
-    user = get_user_by_username(login) or get_user_by_email(login)
+    # One query over both unique indexes; usernames cannot contain "@", so at most
+    # one row matches
+    user = User.query.filter(or_(User.username == login, User.email == login)).first()
     if not user or not user.check_password(password):
         return None
+    if user.password_needs_rehash():
+        # BCRYPT_ROUNDS changed since this hash was made; upgrade it transparently
+        user.set_password(password)
+        db.session.commit()
     return user
+
+
+def get_profile(user_id: int, claims: dict) -> dict | None:
+    """
+    Profile for /me: per-process cache, then token claims, then the DB.
+    Returns None if the user no longer exists.
+    """
+    profile = profiles.get_cached(user_id)
+    if profile is not None:
+        # Not stored again: the entry must expire PROFILE_CACHE_TTL_SECONDS after
+        # it was read, however often it is served
+        return profile
+    profile = profiles.from_claims(user_id, claims)
+    if profile is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        profile = user.to_dict()
+    profiles.store(user_id, profile)
+    return profile
+
+
+def access_token_claims(user: User) -> dict:
+    """Additional JWT claims (stable profile fields) for a user's access token."""
+    return profiles.claims_for(user.to_dict())
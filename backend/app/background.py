@@ -0,0 +1,67 @@
+"""Shared infra: bounded background executor for best-effort work (e.g. cache warming).
+
+Tasks run in a small thread pool inside an app context. When BACKGROUND_MAX_PENDING
+tasks are already queued, new ones are dropped: nothing submitted here may be needed
+for correctness. BACKGROUND_WORKERS=0 runs tasks inline (useful in tests).
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_pending: threading.BoundedSemaphore | None = None
+_lock = threading.Lock()
+
+
+def _get_executor(workers: int, max_pending: int) -> ThreadPoolExecutor:
+    global _executor, _pending
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _pending = threading.BoundedSemaphore(max_pending)
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="background"
+                )
+    return _executor
+
+
+def reset_after_fork() -> None:
+    """Drop the executor inherited from a preloading parent (its threads are gone)."""
+    global _executor, _pending, _lock
+    _executor = None
+    _pending = None
+    _lock = threading.Lock()
+
+
+def _run(app, fn, args, kwargs) -> None:
+    try:
+        with app.app_context():
+            fn(*args, **kwargs)
+    except Exception:
+        logger.exception("background task %s failed", getattr(fn, "__name__", fn))
+    finally:
+        _pending.release()
+
+
+def submit(fn, *args, **kwargs) -> bool:
+    """Run fn(*args, **kwargs) in the background. Returns False if it was dropped."""
+    app = current_app._get_current_object()
+    workers = app.config.get("BACKGROUND_WORKERS", 4)
+    if workers <= 0:
+        try:
+            fn(*args, **kwargs)
+        except Exception:
+            logger.exception("inline task %s failed", getattr(fn, "__name__", fn))
+        return True
+    executor = _get_executor(workers, app.config.get("BACKGROUND_MAX_PENDING") or 100)
+    if not _pending.acquire(blocking=False):
+        logger.warning("background queue full; dropped %s", getattr(fn, "__name__", fn))
+        return False
+    executor.submit(_run, app, fn, args, kwargs)
+    return True
@@ -0,0 +1,168 @@
+"""Shared infra: small key/value cache, process-local with optional Redis (REDIS_URL).
+
+Domains keep bulky values in a LocalCache and use get_shared_cache() for the small
+counters/flags that must agree across gunicorn workers. Without REDIS_URL the shared
+cache is process-local too (fine for a single worker and for tests).
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LocalCache:
+    """Thread-safe in-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[object, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expiry = item
+            if expiry <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, key: str, value, ttl: float) -> bool:
+        """Set key only if it is absent (or expired). Returns True if it was set."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] > time.monotonic():
+                return False
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, ttl: float = 86400) -> int:
+        with self._lock:
+            value, _ = self._data.get(key, (0, 0.0))
+            value = int(value) + 1
+            self._data[key] = (value, time.monotonic() + ttl)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Same interface as LocalCache on top of Redis; values are JSON-encoded."""
+
+    def __init__(self, client, prefix: str = "weatherapp:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value, ttl: float) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def add(self, key: str, value, ttl: float) -> bool:
+        return bool(
+            self.client.set(
+                self.prefix + key, json.dumps(value), ex=max(1, int(ttl)), nx=True
+            )
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str, ttl: float = 86400) -> int:
+        pipe = self.client.pipeline()
+        pipe.incr(self.prefix + key)
+        pipe.expire(self.prefix + key, max(1, int(ttl)))
+        value, _ = pipe.execute()
+        return int(value)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+_redis_clients: dict[tuple[str, float | None], object] = {}
+_redis_lock = threading.Lock()
+
+
+def get_redis(url: str | None = None, socket_timeout: float | None = 1.0):
+    """
+    Redis client for url (default: REDIS_URL config), or None when not configured.
+    Clients are shared per (url, socket_timeout); redis-py pools are thread-safe and
+    reset themselves after fork. Pass socket_timeout=None for blocking readers.
+    """
+    if url is None:
+        url = current_app.config.get("REDIS_URL") or ""
+    if not url:
+        return None
+    key = (url, socket_timeout)
+    client = _redis_clients.get(key)
+    if client is None:
+        import redis
+
+        with _redis_lock:
+            client = _redis_clients.get(key)
+            if client is None:
+                client = redis.Redis.from_url(url, socket_timeout=socket_timeout)
+                _redis_clients[key] = client
+    return client
+
+
+def init_cache(flask_app) -> None:
+    """Create the app's shared cache (Redis if REDIS_URL is set, else in-process)."""
+    url = flask_app.config.get("REDIS_URL") or ""
+    if url:
+        flask_app.extensions["shared_cache"] = RedisCache(get_redis(url))
+    else:
+        # Holds small counters only; sized so version keys are not evicted in practice
+        flask_app.extensions["shared_cache"] = LocalCache(max_entries=100_000)
+
+
+def reset_after_fork(flask_app) -> None:
+    """Forget clients and cached entries inherited from a preloading parent."""
+    global _redis_lock
+    _redis_clients.clear()
+    _redis_lock = threading.Lock()
+    flask_app.extensions.pop("local_caches", None)
+    init_cache(flask_app)
+
+
+def get_shared_cache():
+    """Cache shared by all workers (falls back to in-process without REDIS_URL)."""
+    return current_app.extensions["shared_cache"]
+
+
+def get_local_cache(name: str, max_entries: int = 1024) -> LocalCache:
+    """Named in-process cache owned by the current app (created on first use)."""
+    caches = current_app.extensions.setdefault("local_caches", {})
+    cache = caches.get(name)
+    if cache is None:
+        cache = caches.setdefault(name, LocalCache(max_entries=max_entries))
+    return cache
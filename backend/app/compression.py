@@ -0,0 +1,39 @@
+"""Shared infra: response compression with a cache of compressed bodies.
+
+Flask-Compress negotiates the encoding (br preferred, then gzip; COMPRESS_ALGORITHM)
+and skips bodies under COMPRESS_MIN_SIZE bytes. Its own cache is keyed by request,
+which is wrong for per-user or expiring responses, so it stays off; instead
+compressed bodies are cached per process by (encoding, content hash). Only 200s from
+COMPRESS_CACHE_PATHS are cached: there identical payloads (the same city search, the
+same current weather served to many clients within its TTL) cost one hash instead of
+one compression pass each. Per-user or one-off bodies (zone lists, exports) would only
+churn the cache, so they are compressed per request as plain Flask-Compress does.
+"""
+
+import hashlib
+
+from flask import request
+from flask_compress import Compress
+
+from app.cache import get_local_cache
+
+
+class CachingCompress(Compress):
+    def compress(self, app, response, algorithm):
+        if (
+            response.status_code != 200
+            or request.path not in app.config["COMPRESS_CACHE_PATHS"]
+        ):
+            return super().compress(app, response, algorithm)
+        body = response.get_data()
+        if len(body) > app.config["COMPRESS_CACHE_MAX_BYTES"]:
+            return super().compress(app, response, algorithm)
+        cache = get_local_cache(
+            "compressed", max_entries=app.config["COMPRESS_CACHE_ENTRIES"]
+        )
+        key = algorithm + ":" + hashlib.blake2b(body, digest_size=16).hexdigest()
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = super().compress(app, response, algorithm)
+            cache.set(key, compressed, app.config["COMPRESS_CACHE_TTL_SECONDS"])
+        return compressed
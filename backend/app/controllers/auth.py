@@ -1,10 +1,16 @@
 """Auth: Connexion handlers (operationId targets)."""
 
 from flask import request
-from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity, jwt_required
 
-from app.auth.models import User
-from app.auth.service import authenticate_user, register_user
+from app.auth.hashing import AuthBusyError
+from app.auth.revocation import revoke
+from app.auth.service import (
+    access_token_claims,
+    authenticate_user,
+    get_profile,
+    register_user,
+)
 from app.logging_config import get_logger
 
 _AUDIT = get_logger("app.auth.audit")
@@ -30,9 +36,13 @@ def auth_register_post(body):
         user, err = register_user(username, email, password)
         if err:
             return {"code": "validation_error", "message": err}, 400
-        token = create_access_token(identity=str(user.id))
+        token = create_access_token(
+            identity=str(user.id), additional_claims=access_token_claims(user)
+        )
         _AUDIT.info("register success user_id=%s ip=%s", user.id, _client_ip(), extra={"event": "register_success", "user_id": user.id, "ip": _client_ip()})
         return {"user": user.to_dict(), "access_token": token}, 201
+    except AuthBusyError as e:
+        return {"code": "unavailable", "message": str(e)}, 503
     except Exception as e:
         return {"code": "internal_error", "message": str(e)}, 500
 
@@ -44,11 +54,16 @@ def auth_login_post(body):
 
     if not login or not password:
         return {"code": "validation_error", "message": "login and password are required"}, 400
-    user = authenticate_user(login, password)
+    try:
+        user = authenticate_user(login, password)
+    except AuthBusyError as e:
+        return {"code": "unavailable", "message": str(e)}, 503
     if not user:
         _AUDIT.warning("login failure login=%s ip=%s", login[:32], ip, extra={"event": "login_failure", "ip": ip})
         return {"code": "unauthorized", "message": "Invalid login or password"}, 401
-    token = create_access_token(identity=str(user.id))
+    token = create_access_token(
+        identity=str(user.id), additional_claims=access_token_claims(user)
+    )
     _AUDIT.info("login success user_id=%s ip=%s", user.id, ip, extra={"event": "login_success", "user_id": user.id, "ip": ip})
     return {"user": user.to_dict(), "access_token": token}, 200
 
@@ -56,13 +71,16 @@ def auth_login_post(body):
 @jwt_required()
 def auth_me_get():
     user_id = int(get_jwt_identity())  # JWT identity is stored as string
-    user = User.query.get(user_id)
-    if not user:
+    profile = get_profile(user_id, get_jwt())
+    if profile is None:
         return {"code": "not_found", "message": "User not found"}, 404
-    return user.to_dict(), 200
+    return profile, 200
 
 
 @jwt_required()
 def auth_logout_post():
-    """Logout: client should discard token. Server blacklist optional (not implemented for MVP)."""
+    """Logout: revoke the presented access token until it expires."""
+    claims = get_jwt()
+    revoke(claims["jti"], int(get_jwt_identity()), claims["exp"])
+    _AUDIT.info("logout user_id=%s ip=%s", claims["sub"], _client_ip(), extra={"event": "logout", "user_id": claims["sub"], "ip": _client_ip()})
     return {}, 200
@@ -1,4 +1,9 @@
-"""Health check handler (OpenAPI operationId)."""
+"""Health check handlers (OpenAPI operationId)."""
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from app.db_pool import pool_stats
+from app.db_routing import is_healthy, replica_keys
+from app.extensions import db
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -7,3 +12,21 @@ logger = get_logger(__name__)
 def health_get():
     logger.debug("health check")
     return {"status": "ok"}, 200
+
+
+@jwt_required(optional=True)
+def health_db_get():
+    """
+    GET /api/health/db - "ok", or "degraded" while a read replica is unhealthy.
+    Pool gauges and checkout wait (this worker) only with a valid JWT.
+    """
+    keys = replica_keys(db.engines)
+    status = "ok" if all(is_healthy(key) for key in keys) else "degraded"
+    if get_jwt_identity() is None:
+        return {"status": status}, 200
+    replicas = [
+        {"name": key, "healthy": is_healthy(key), **pool_stats(db.engines[key].pool)}
+        for key in keys
+    ]
+    pool = pool_stats(db.engine.pool)
+    return {"status": status, "pool": pool, "replicas": replicas}, 200
@@ -1,6 +1,11 @@
 """Weather: Connexion handlers for search and current."""
 
-from app.weather.service import get_current_weather, search_cities_query
+from app.weather.service import (
+    get_current_weather,
+    get_current_weather_batch,
+    get_forecast,
+    search_cities_query,
+)
 
 
 def weather_search_get(q):
@@ -20,3 +25,24 @@ def weather_current_get(lat, lon):
     if not data:
         return {"message": "Weather unavailable"}, 503
     return data, 200
+
+
+def weather_forecast_get(lat, lon, hours=None):
+    """GET /api/weather/forecast?lat=&lon=&hours= - 3-hourly forecast (cached)."""
+    data = get_forecast(float(lat), float(lon), hours=hours)
+    if not data:
+        return {"message": "Forecast unavailable"}, 503
+    return data, 200
+
+
+def weather_current_batch_post(body):
+    """POST /api/weather/current/batch - current weather for many coordinates."""
+    # Count and bounds are validated against openapi.yaml (maxItems 100)
+    items = (body or {}).get("coordinates") or []
+    coords = [(float(item["lat"]), float(item["lon"])) for item in items]
+    by_coord = get_current_weather_batch(coords)
+    results = []
+    for lat, lon in coords:
+        status, weather = by_coord[(lat, lon)]
+        results.append({"lat": lat, "lon": lon, "status": status, "weather": weather})
+    return {"results": results}, 200
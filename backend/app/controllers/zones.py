@@ -1,19 +1,140 @@
 """Zones: Connexion handlers; all require JWT; 404 when zone is not owned by user."""
 
+import csv
+import io
+import json
+import threading
+import time
+
+from flask import Response, current_app, request, stream_with_context
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
+from app import events, json_provider
+from app.extensions import db
 from app.zones import service as zone_service
 
+# Open SSE streams in this process (each holds one worker thread)
+_sse_slots: threading.BoundedSemaphore | None = None
+_sse_slots_lock = threading.Lock()
+
+
+def _acquire_sse_slot(limit: int) -> threading.BoundedSemaphore | None:
+    global _sse_slots
+    if _sse_slots is None:
+        with _sse_slots_lock:
+            if _sse_slots is None:
+                _sse_slots = threading.BoundedSemaphore(limit)
+    return _sse_slots if _sse_slots.acquire(blocking=False) else None
+
+
+def _weather_event_stream(sub, topics, heartbeat, max_seconds):
+    """SSE body: weather events for the subscribed zones, heartbeats in between."""
+    # Clients reconnect after max_seconds; ask them to wait a bit first
+    yield "retry: 3000\n\n"
+    deadline = time.monotonic() + max_seconds
+    while time.monotonic() < deadline:
+        event = sub.get(timeout=heartbeat)
+        if event is None:
+            # Also how a closed connection is noticed: the write fails
+            yield ": keep-alive\n\n"
+            continue
+        payload = {"zone_ids": topics[event["topic"]], "weather": event["data"]}
+        data = json.dumps(payload, default=json_provider.default)
+        yield f"event: weather\ndata: {data}\n\n"
+
+
+def _sparse_args(include, fields):
+    """(fields, include_weather) from ?fields= and ?include= (both optional lists)."""
+    if fields is not None:
+        fields = tuple(dict.fromkeys(fields))
+    # Weather by default, unless the client picked fields and did not ask for it
+    include_weather = "weather" in include if include is not None else fields is None
+    return fields, include_weather
+
+
+@jwt_required()
+def zones_list_get(
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_total: bool | None = None,
+    include: list[str] | None = None,
+    fields: list[str] | None = None,
+):
+    user_id = int(get_jwt_identity())
+    after = None
+    if cursor:
+        after = zone_service.decode_cursor(cursor)
+        if after is None:
+            return {"code": "validation_error", "message": "Invalid cursor"}, 400
+    if include_total is None:
+        # Offset clients expect total; cursor clients opt in to the COUNT
+        include_total = after is None
+    fields, include_weather = _sparse_args(include, fields)
+    items, total, next_cursor = zone_service.list_for_user(
+        user_id,
+        limit=limit,
+        offset=offset,
+        after=after,
+        include_total=include_total,
+        fields=fields,
+        include_weather=include_weather,
+    )
+    return {"items": items, "total": total, "next_cursor": next_cursor}, 200
+
+
+@jwt_required()
+def zones_events_get():
+    """GET /api/zones/events - Server-Sent Events with weather updates for my zones."""
+    user_id = int(get_jwt_identity())
+    cfg = current_app.config
+    slots = _acquire_sse_slot(cfg.get("SSE_MAX_CONNECTIONS") or 4)
+    if slots is None:
+        return {
+            "code": "unavailable",
+            "message": "Too many live connections. Please retry later.",
+        }, 503
+    try:
+        topics = zone_service.weather_topics_for_user(user_id)
+        sub = events.subscribe(set(topics))
+    except Exception:
+        slots.release()
+        raise
+    # The stream never touches the DB; hand the connection back before streaming
+    db.session.close()
+    response = Response(
+        _weather_event_stream(
+            sub,
+            topics,
+            cfg.get("SSE_HEARTBEAT_SECONDS") or 15,
+            cfg.get("SSE_MAX_SECONDS") or 300,
+        ),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+    @response.call_on_close
+    def _release():
+        sub.close()
+        slots.release()
+
+    return response
+
 
 @jwt_required()
-def zones_list_get(limit: int = 50, offset: int = 0):
+def zones_export_get(format: str = "ndjson"):
     user_id = int(get_jwt_identity())
-    items, total = zone_service.list_for_user(user_id, limit=limit, offset=offset)
-    return {"items": items, "total": total}, 200
+    mimetype = "text/csv" if format == "csv" else "application/x-ndjson"
+    # stream_with_context keeps the request (and DB session) alive while streaming
+    return Response(
+        stream_with_context(zone_service.export_for_user(user_id, fmt=format)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=zones.{format}"},
+    )
 
 
 @jwt_required()
-def zones_create_post(body):
+def zones_create_post(body, defer_weather: bool = False):
     user_id = int(get_jwt_identity())
     data = body if isinstance(body, dict) else (body or {})
     name = (data.get("name") or "").strip()
@@ -39,6 +160,7 @@ def zones_create_post(body):
         country_code=country_code,
         latitude=latitude,
         longitude=longitude,
+        defer_weather=defer_weather,
     )
     if err:
         return {"code": "validation_error", "message": err}, 400
@@ -46,9 +168,14 @@ def zones_create_post(body):
 
 
 @jwt_required()
-def zones_get(zone_id: int):
+def zones_get(
+    zone_id: int, include: list[str] | None = None, fields: list[str] | None = None
+):
     user_id = int(get_jwt_identity())
-    zone = zone_service.get_by_id_for_user(zone_id, user_id)
+    fields, include_weather = _sparse_args(include, fields)
+    zone = zone_service.get_by_id_for_user(
+        zone_id, user_id, fields=fields, include_weather=include_weather
+    )
     if zone is None:
         return {"code": "not_found", "message": "Zone not found"}, 404
     return zone, 200
@@ -80,3 +207,79 @@ def zones_refresh_post(zone_id: int):
     if zone is None:
         return {"code": "not_found", "message": "Zone not found"}, 404
     return zone, 200
+
+
+def _parse_bulk_items(body) -> tuple[list | None, str | None]:
+    """Parse a bulk upload (JSON array, NDJSON or CSV with a header row) into items."""
+    if isinstance(body, list):
+        return body, None
+    raw = body if isinstance(body, (bytes, str)) else b""
+    text = raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw
+    mimetype = request.mimetype
+    try:
+        if mimetype == "text/csv":
+            return list(csv.DictReader(io.StringIO(text))), None
+        if mimetype == "application/x-ndjson":
+            items = []
+            for line_no, line in enumerate(text.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    return None, f"Invalid JSON on line {line_no}"
+            return items, None
+        data = json.loads(text) if text.strip() else None
+    except (ValueError, csv.Error) as e:
+        return None, f"Could not parse request body: {e}"
+    if not isinstance(data, list):
+        return None, "Request body must be a JSON array of zones"
+    return data, None
+
+
+@jwt_required()
+def zones_bulk_create_post(body=None):
+    user_id = int(get_jwt_identity())
+    items, err = _parse_bulk_items(body)
+    if err:
+        return {"code": "validation_error", "message": err}, 400
+    if not items:
+        return {"code": "validation_error", "message": "No zones in request"}, 400
+    if len(items) > zone_service.BULK_MAX_ITEMS:
+        return {
+            "code": "validation_error",
+            "message": f"At most {zone_service.BULK_MAX_ITEMS} zones per request",
+        }, 400
+    results = zone_service.bulk_create(user_id, items)
+    created = sum(1 for r in results if r["status"] == "created")
+    return {
+        "results": results,
+        "created": created,
+        "failed": len(results) - created,
+    }, 200
+
+
+@jwt_required()
+def zones_bulk_delete_post(body):
+    user_id = int(get_jwt_identity())
+    ids = (body or {}).get("ids") or []
+    results = zone_service.bulk_delete(user_id, ids)
+    deleted = sum(1 for r in results if r["status"] == "deleted")
+    return {"results": results, "deleted": deleted}, 200
+
+
+@jwt_required()
+def zones_refresh_all_post(body=None):
+    user_id = int(get_jwt_identity())
+    zone_ids = (body or {}).get("zone_ids") if isinstance(body, dict) else None
+    result, retry_after = zone_service.refresh_weather_all(user_id, zone_ids=zone_ids)
+    if result is None:
+        return (
+            {
+                "code": "rate_limit_exceeded",
+                "message": "Zones were refreshed recently. Please try again later.",
+            },
+            429,
+            {"Retry-After": str(retry_after)},
+        )
+    return result, 200
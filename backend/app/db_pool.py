@@ -0,0 +1,113 @@
+"""Shared infra: DB connection pool telemetry and warm-up.
+
+The pool itself is sized in config.py (SQLALCHEMY_ENGINE_OPTIONS, per worker process).
+init_pool() swaps in TimedQueuePool, a QueuePool that times every checkout: the wait
+for a free connection, or for a new one to be opened. pool_stats() reports that along
+with the checked-out count and overflow use (GET /api/health/db). warm_pool() opens the
+pool when a worker starts, so its first requests don't pay for the connects.
+"""
+
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times and timeouts (for this process)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                if waited > self.wait_max:
+                    self.wait_max = waited
+
+
+def init_pool(flask_app) -> None:
+    """Use TimedQueuePool when the engine options configure a QueuePool (not SQLite)."""
+    options = dict(flask_app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    if "pool_size" in options:
+        options.setdefault("poolclass", TimedQueuePool)
+        flask_app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def pool_stats(pool) -> dict:
+    """Gauges and checkout timings of pool (only the gauges the pool class supports)."""
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # QueuePool counts overflow from -size; above 0 it is connections past size
+            overflow=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, TimedQueuePool):
+        with pool._stats_lock:
+            checkouts = pool.checkouts
+            stats.update(
+                checkouts=checkouts,
+                checkout_wait_avg_ms=round(
+                    pool.wait_total / checkouts * 1000 if checkouts else 0.0, 3
+                ),
+                checkout_wait_max_ms=round(pool.wait_max * 1000, 3),
+                checkout_timeouts=pool.timeouts,
+            )
+    return stats
+
+
+def warm_pool(flask_app) -> int:
+    """
+    Open DB_POOL_WARM pooled connections (capped at the pool size) per engine, primary
+    and replicas, and return them to the pool (gunicorn post_worker_init). Returns how
+    many opened; never raises: a database that is down at boot only means connecting
+    on demand later.
+    """
+    from app.extensions import db
+
+    opened = 0
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            if not isinstance(engine.pool, QueuePool):
+                continue
+            count = min(flask_app.config.get("DB_POOL_WARM", 0), engine.pool.size())
+            connections = []
+            try:
+                for _ in range(count):
+                    connections.append(engine.connect())
+            except exc.SQLAlchemyError as e:
+                logger.warning(
+                    "pool warm-up for %s stopped after %d connections: %s",
+                    engine.url.render_as_string(hide_password=True),
+                    len(connections),
+                    e,
+                )
+            finally:
+                for connection in connections:
+                    connection.close()
+            opened += len(connections)
+    return opened
@@ -0,0 +1,190 @@
+"""Shared infra: read-replica routing for the db session (DATABASE_READ_URL).
+
+Replicas are Flask-SQLAlchemy binds named replica0, replica1, ... (config.py). Only
+SELECTs issued while serving a GET/HEAD request go to a replica; everything else
+(writes, reads in POST/PUT/DELETE handlers that may act on what they read, background
+tasks, migrations) uses the primary. A session sticks to one replica, and to the
+primary once it has written. After a request that wrote, the same client reads from
+the primary for DB_READ_STICKY_SECONDS, so it sees its own writes despite replication
+lag. The window travels with the client in a short-lived cookie, whichever worker
+answers next; with REDIS_URL it is also kept per Authorization header in the shared
+cache, for clients that drop cookies.
+
+A read that fails with a connection error on a replica marks that replica unhealthy
+for DB_REPLICA_RETRY_SECONDS and is retried once on another replica or the primary.
+"""
+
+import hashlib
+import itertools
+import math
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import exc
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+REPLICA_PREFIX = "replica"
+_READ_METHODS = ("GET", "HEAD")
+# Unix time until which the client reads from the primary
+STICKY_COOKIE = "db_sticky"
+
+# Bind key -> time.monotonic() until which the replica is skipped (this process)
+_unhealthy_until: dict[str, float] = {}
+_round_robin = itertools.count()
+
+
+def replica_keys(engines) -> list[str]:
+    return sorted(key for key in engines if key and str(key).startswith(REPLICA_PREFIX))
+
+
+def is_healthy(key: str) -> bool:
+    return _unhealthy_until.get(key, 0.0) <= time.monotonic()
+
+
+def mark_unhealthy(key: str, seconds: float) -> None:
+    _unhealthy_until[key] = time.monotonic() + seconds
+
+
+def _pick_replica(keys: list[str]) -> str | None:
+    """Next healthy replica, round-robin across sessions; None if all are down."""
+    healthy = [key for key in keys if is_healthy(key)]
+    if not healthy:
+        return None
+    return healthy[next(_round_robin) % len(healthy)]
+
+
+def _sticky_key() -> str | None:
+    auth = request.headers.get("Authorization")
+    if not auth:
+        return None
+    return "db:sticky:" + hashlib.sha256(auth.encode("utf-8")).hexdigest()[:32]
+
+
+def _cookie_window_open() -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE) or 0) > time.time()
+    except ValueError:
+        return False
+
+
+def _recently_wrote() -> bool:
+    """True while this client is in its read-your-writes window (once per request)."""
+    if "_db_sticky" not in g:
+        g._db_sticky = _cookie_window_open()
+        # Without REDIS_URL the shared cache is this process only: the cookie decides
+        if not g._db_sticky and current_app.config.get("REDIS_URL"):
+            from app.cache import get_shared_cache
+
+            key = _sticky_key()
+            try:
+                g._db_sticky = key is not None and bool(get_shared_cache().get(key))
+            except Exception as e:
+                # Cache down: without the window a replica could miss the writes
+                logger.warning("db sticky lookup failed: %s", e)
+                g._db_sticky = True
+    return g._db_sticky
+
+
+def _is_connection_error(error: exc.DBAPIError) -> bool:
+    return error.connection_invalidated or isinstance(
+        error, (exc.OperationalError, exc.InterfaceError)
+    )
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends a GET request's SELECTs to a replica."""
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self._wrote = False
+        self._replica: str | None = None
+        self._last_bind = None
+
+    def use_primary(self) -> None:
+        """Read from the primary from now on (reads that decide what to write)."""
+        self._wrote = True
+        self._replica = None
+
+    def _mark_write(self) -> None:
+        self.use_primary()
+        if has_request_context():
+            g._db_wrote = True
+
+    def _can_read_replica(self, engines) -> bool:
+        return (
+            not self._wrote
+            and has_request_context()
+            and request.method in _READ_METHODS
+            # No replicas, no window to look up
+            and bool(replica_keys(engines))
+            and not _recently_wrote()
+        )
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        engines = self._db.engines
+        if bind is not None or engine is not engines.get(None):
+            self._last_bind = engine
+            return engine
+        if self._flushing or getattr(clause, "is_dml", False):
+            self._mark_write()
+        elif getattr(clause, "is_select", False) and self._can_read_replica(engines):
+            if self._replica is None or not is_healthy(self._replica):
+                self._replica = _pick_replica(replica_keys(engines))
+            if self._replica is not None:
+                engine = engines[self._replica]
+        self._last_bind = engine
+        return engine
+
+    def execute(self, statement, *args, **kwargs):
+        try:
+            return super().execute(statement, *args, **kwargs)
+        except exc.DBAPIError as e:
+            replica = self._replica
+            if (
+                replica is None
+                or self._last_bind is not self._db.engines.get(replica)
+                or not _is_connection_error(e)
+                or self._wrote
+                or self.new
+                or self.dirty
+                or self.deleted
+            ):
+                raise
+            mark_unhealthy(replica, current_app.config["DB_REPLICA_RETRY_SECONDS"])
+            logger.warning("replica %s unavailable, reading elsewhere: %s", replica, e)
+            self._replica = None
+            self.rollback()
+            return super().execute(statement, *args, **kwargs)
+
+
+def init_routing(flask_app) -> None:
+    """Open the read-your-writes window after requests that wrote (replicas only)."""
+    if not flask_app.config.get("SQLALCHEMY_BINDS"):
+        return
+
+    @flask_app.after_request
+    def remember_write(response):
+        if g.get("_db_wrote"):
+            from app.cache import get_shared_cache
+
+            seconds = flask_app.config["DB_READ_STICKY_SECONDS"]
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{time.time() + seconds:.3f}",
+                max_age=math.ceil(seconds),
+                secure=request.is_secure,
+                httponly=True,
+                samesite="Lax",
+            )
+            key = _sticky_key()
+            if key is not None and flask_app.config.get("REDIS_URL"):
+                try:
+                    get_shared_cache().set(key, 1, seconds)
+                except Exception as e:
+                    logger.warning("db sticky write failed: %s", e)
+        return response
@@ -0,0 +1,131 @@
+"""Shared infra: in-process pub/sub for push updates, optionally fanned out over Redis.
+
+publish() delivers to subscribers in this process; with REDIS_URL it goes through a
+Redis channel instead so every worker's subscribers see it. Subscriptions are bounded
+queues: a slow client loses events rather than growing memory.
+"""
+
+import json
+import queue
+import threading
+import time
+
+from flask import current_app
+
+from app import json_provider
+from app.cache import get_redis
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CHANNEL = "weatherapp:events"
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """Events for a set of topics; iterate with get()."""
+
+    def __init__(self, broker: "Broker", topics: set[str]):
+        self.broker = broker
+        self.topics = topics
+        self.queue: queue.Queue = queue.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def get(self, timeout: float) -> dict | None:
+        """Next event, or None if none arrived within timeout seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Topic -> subscriptions registry for the current process."""
+
+    def __init__(self):
+        self._subs: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+
+    def subscribe(self, topics: set[str], redis_url: str = "") -> Subscription:
+        sub = Subscription(self, set(topics))
+        with self._lock:
+            for topic in sub.topics:
+                self._subs.setdefault(topic, set()).add(sub)
+            if redis_url and self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, args=(redis_url,), daemon=True
+                )
+                self._listener.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            for topic in sub.topics:
+                subs = self._subs.get(topic)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subs[topic]
+
+    def deliver(self, topic: str, data: dict) -> None:
+        """Hand an event to local subscribers of topic (drops it for full queues)."""
+        with self._lock:
+            subs = list(self._subs.get(topic, ()))
+        event = {"topic": topic, "data": data}
+        for sub in subs:
+            try:
+                sub.queue.put_nowait(event)
+            except queue.Full:
+                pass
+
+    def reset(self) -> None:
+        """Forget subscriptions and the listener thread (e.g. in a forked child)."""
+        self._subs = {}
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def _listen(self, redis_url: str) -> None:
+        """Background thread: relay the Redis channel to local subscribers."""
+        while True:
+            try:
+                pubsub = get_redis(redis_url, socket_timeout=None).pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    event = json.loads(message["data"])
+                    self.deliver(event["topic"], event["data"])
+            except Exception:
+                logger.warning("event listener disconnected; retrying", exc_info=True)
+                time.sleep(1)
+
+
+broker = Broker()
+
+
+def publish(topic: str, data: dict) -> None:
+    """Publish an event to every subscriber of topic (all workers with REDIS_URL)."""
+    redis_url = current_app.config.get("REDIS_URL") or ""
+    if not redis_url:
+        broker.deliver(topic, data)
+        return
+    try:
+        get_redis(redis_url).publish(
+            CHANNEL, json_provider.dumps({"topic": topic, "data": data})
+        )
+    except Exception:
+        logger.warning("event publish failed; delivering locally", exc_info=True)
+        broker.deliver(topic, data)
+
+
+def reset_after_fork() -> None:
+    """Start over in a worker forked from a preloading parent."""
+    broker.reset()
+
+
+def subscribe(topics: set[str]) -> Subscription:
+    """Subscribe to topics in this process (listening on Redis when configured)."""
+    return broker.subscribe(topics, current_app.config.get("REDIS_URL") or "")
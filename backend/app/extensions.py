@@ -2,4 +2,7 @@
 
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from app.db_routing import RoutingSession
+
+# RoutingSession reads from DATABASE_READ_URL replicas where safe (app/db_routing.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
@@ -1,4 +1,4 @@
-"""OpenWeatherMap HTTP client. Geocoding + Current weather (free tier)."""
+"""OpenWeatherMap HTTP client. Geocoding, current weather and 5-day forecast."""
 
 import time
 
@@ -6,6 +6,7 @@ import requests
 
 GEO_URL = "https://api.openweathermap.org/geo/1.0/direct"
 WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
 TIMEOUT = 10
 MAX_RETRIES = 2
 RETRY_BACKOFF = (1, 2)
@@ -127,3 +128,46 @@ def current_weather(api_key: str, lat: float, lon: float) -> dict | None:
             "lon": data.get("coord", {}).get("lon"),
         },
     }
+
+
+def forecast(api_key: str, lat: float, lon: float) -> list[dict] | None:
+    """
+    5-day forecast by lat/lon in 3-hour slots (up to 40). Returns a list of:
+    {"time" (unix seconds, UTC), "temperature_c", "humidity", "wind_speed_kmh"}.
+    """
+    if not (api_key or "").strip():
+        return None
+    resp = _get_with_retry(FORECAST_URL, {
+        "lat": lat,
+        "lon": lon,
+        "appid": api_key,
+        "units": "metric",
+    })
+    if resp.status_code != 200:
+        raise OpenWeatherMapError(
+            f"OpenWeatherMap forecast failed: {resp.status_code}",
+            status_code=resp.status_code,
+            body=resp.text,
+        )
+    data = resp.json()
+    if str(data.get("cod", "200")) != "200":
+        raise OpenWeatherMapError(
+            data.get("message", "Unknown error"),
+            status_code=data.get("cod"),
+            body=data,
+        )
+    out = []
+    for item in data.get("list") or []:
+        if item.get("dt") is None:
+            # Slots are looked up by time; one without it cannot be placed
+            continue
+        main = item.get("main") or {}
+        # wind.speed in m/s; 1 m/s = 3.6 km/h
+        wind_ms = (item.get("wind") or {}).get("speed")
+        out.append({
+            "time": item.get("dt"),
+            "temperature_c": main.get("temp"),
+            "humidity": main.get("humidity"),
+            "wind_speed_kmh": round(wind_ms * 3.6, 1) if wind_ms is not None else None,
+        })
+    return out
@@ -0,0 +1,97 @@
+"""Shared infra: JSON encoding for responses and events (orjson, stdlib fallback).
+
+create_app() installs JSONProvider as app.json. Connexion serializes handler results
+through it (flask.json.dumps(data, indent=2) plus a newline), as does jsonify. With
+orjson installed dumps() runs in orjson with the same options (2-space indent, sorted
+keys); without it, or for anything orjson rejects (e.g. integers beyond 64 bits), the
+stdlib encoder produces the same text. Both write datetimes as isoformat() strings.
+orjson cannot escape non-ASCII characters, so the rare payload that has any (e.g. a
+city name) is re-encoded by the stdlib to keep the \\u escapes clients get today.
+
+dumps() is the compact form for internal JSON (pub/sub messages). Client-facing text
+outside responses (SSE data, NDJSON export) keeps json.dumps' layout, with default()
+for the datetimes.
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json below
+    orjson = None
+
+
+def default(o):
+    """Types beyond plain JSON, for the stdlib encoder and orjson alike."""
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+_compact = json.JSONEncoder(
+    separators=(",", ":"), ensure_ascii=False, default=default
+).encode
+
+if orjson is not None:
+
+    def dumps(obj) -> str:
+        """Compact JSON text (no spaces, keys in insertion order)."""
+        try:
+            return orjson.dumps(obj, default=default).decode()
+        except TypeError:
+            return _compact(obj)
+
+else:
+    dumps = _compact
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's DefaultJSONProvider with orjson doing dumps() when it can."""
+
+    default = staticmethod(default)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is not None:
+            option = self._orjson_option(kwargs)
+            if option is not None:
+                try:
+                    out = orjson.dumps(obj, default=self.default, option=option)
+                except TypeError:
+                    out = None
+                if out is not None and (out.isascii() or not self.ensure_ascii):
+                    return out.decode()
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def _orjson_option(self, kwargs: dict) -> int | None:
+        """orjson flags matching these json.dumps kwargs (None: use json.dumps)."""
+        if kwargs.keys() - {"indent", "separators", "sort_keys"}:
+            return None
+        option = orjson.OPT_NON_STR_KEYS
+        indent = kwargs.get("indent")
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        elif indent is not None:
+            return None
+        elif tuple(kwargs.get("separators") or ()) != (",", ":"):
+            # json.dumps without indent separates with ", " and ": "
+            return None
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return option
@@ -3,20 +3,66 @@ Logging and monitoring: centralised config, structured logs, request logging.
 
 Use get_logger(__name__) in domains and handlers. Call init_logging() from create_app().
 """
+import atexit
 import json
 import logging
 import os
+import queue
+import random
+import secrets
+import threading
 import time
-import uuid
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json below
+    orjson = None
 
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 LOG_JSON = os.environ.get("LOG_JSON", "false").lower() in ("1", "true", "yes")
 LOG_FORMAT = os.environ.get("LOG_FORMAT", "%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+# Write log lines from a background thread; request threads only enqueue records
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "true").lower() in ("1", "true", "yes")
+# Records waiting for the writer; beyond this they are dropped, never waited for
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+# How often the writer logs a count of dropped records (also logged at shutdown)
+LOG_DROP_REPORT_SECONDS = float(os.environ.get("LOG_DROP_REPORT_SECONDS", 60))
+# Fraction of successful (< 400) requests logged by request_logging; errors always are
+LOG_REQUEST_SAMPLE_RATE = float(os.environ.get("LOG_REQUEST_SAMPLE_RATE", 1.0))
+# gunicorn: keep its access log; merged: no gunicorn access log, request_logging lines
+# carry its fields (client, size, user agent); off: no gunicorn access log
+ACCESS_LOG = os.environ.get("ACCESS_LOG", "gunicorn").lower()
+
+# Attributes every LogRecord has; anything else on a record came from extra=...
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message", "asctime", "taskName",
+}
+
+if orjson is not None:
+    def _dumps(payload: dict) -> str:
+        return orjson.dumps(payload, default=str).decode()
+else:
+    _dumps = json.JSONEncoder(separators=(",", ":"), default=str).encode
 
 
 class JsonFormatter(logging.Formatter):
     """One JSON object per log line (for log aggregators)."""
 
+    _second = None
+    _second_text = ""
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        # Many records share a second: format that part once
+        second = int(record.created)
+        if second != self._second:
+            converted = self.converter(record.created)
+            self._second_text = time.strftime(self.default_time_format, converted)
+            self._second = second
+        return self.default_msec_format % (self._second_text, record.msecs)
+
     def format(self, record: logging.LogRecord) -> str:
         payload = {
             "timestamp": self.formatTime(record, self.datefmt),
@@ -24,22 +70,96 @@ class JsonFormatter(logging.Formatter):
             "logger": record.name,
             "message": record.getMessage(),
         }
-        for key, value in record.__dict__.items():
-            if key not in (
-                "name", "msg", "args", "created", "filename", "funcName",
-                "levelname", "levelno", "lineno", "module", "msecs",
-                "pathname", "process", "processName", "relativeCreated",
-                "stack_info", "exc_info", "exc_text", "thread", "threadName",
-                "message", "asctime",
-            ) and value is not None:
+        attrs = record.__dict__
+        for key in attrs.keys() - _RECORD_ATTRS:
+            value = attrs[key]
+            if value is not None:
                 payload[key] = value
         if record.exc_info:
             payload["exception"] = self.formatException(record.exc_info)
-        return json.dumps(payload)
+        return _dumps(payload)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller: drops records if the queue is full."""
+
+    def __init__(self, queue_):
+        super().__init__(queue_)
+        self.dropped = 0
+        self._reported = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Unlike QueueHandler.prepare, msg and args are not merged here: that would
+        # format on the request thread, and flatten exc_info into the message before
+        # JsonFormatter sees it. The queue never leaves this process, so the listener
+        # formats the original record (args are read then, not when logged).
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def take_dropped(self) -> int:
+        """Records dropped since the last call."""
+        with self._dropped_lock:
+            count = self.dropped - self._reported
+            self._reported = self.dropped
+        return count
+
+
+class _DropReportingListener(QueueListener):
+    """QueueListener that logs the drop count of its queue handler now and then."""
+
+    def __init__(self, queue_, handler, source):
+        super().__init__(queue_, handler, respect_handler_level=True)
+        self.source = source
+        self._next_report = time.monotonic() + LOG_DROP_REPORT_SECONDS
+
+    def handle(self, record):
+        super().handle(record)
+        # Drops only happen while records are flowing, so checking here is enough
+        if time.monotonic() >= self._next_report:
+            self._next_report = time.monotonic() + LOG_DROP_REPORT_SECONDS
+            self.report_dropped()
+
+    def report_dropped(self) -> None:
+        count = self.source.take_dropped()
+        if count:
+            super().handle(
+                logging.LogRecord(
+                    __name__, logging.WARNING, __file__, 0,
+                    "Dropped %d log records: queue full (LOG_QUEUE_SIZE=%d)",
+                    (count, LOG_QUEUE_SIZE), None,
+                )
+            )
+
+    def enqueue_sentinel(self):
+        # Blocking put: with the queue full, put_nowait would fail and stop() with it
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        super().stop()
+        self.report_dropped()
+
+
+_listener = None
+
+
+def _stop_listener() -> None:
+    """Flush queued records and report drops (at exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def init_logging() -> None:
     """Configure root logger and app logger. Call once at startup."""
+    global _listener
     level = getattr(logging, LOG_LEVEL, logging.INFO)
     root = logging.getLogger()
     root.setLevel(level)
@@ -50,10 +170,31 @@ def init_logging() -> None:
             handler.setFormatter(JsonFormatter())
         else:
             handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        if LOG_ASYNC:
+            records = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+            queue_handler = _DroppingQueueHandler(records)
+            _listener = _DropReportingListener(records, handler, queue_handler)
+            _listener.start()
+            handler = queue_handler
         root.addHandler(handler)
     logging.getLogger("app").setLevel(level)
 
 
+atexit.register(_stop_listener)
+
+
+def reset_after_fork() -> None:
+    """Replace root handlers inherited from a preloading parent with our own."""
+    global _listener
+    # The parent's listener thread does not exist here: just forget it
+    _listener = None
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        handler.flush()
+        root.removeHandler(handler)
+    init_logging()
+
+
 def get_logger(name: str) -> logging.Logger:
     """Return a logger for the given module (e.g. __name__)."""
     return logging.getLogger(name)
@@ -66,20 +207,35 @@ def request_logging(app) -> None:
     @app.before_request
     def before_request():
         from flask import g, request
-        g.request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())[:8]
+        g.request_id = request.headers.get("X-Request-ID") or secrets.token_hex(4)
         g.request_start = time.perf_counter()
 
     @app.after_request
     def after_request(response):
         from flask import g, request
-        duration_ms = (time.perf_counter() - getattr(g, "request_start", 0)) * 1000
         request_id = getattr(g, "request_id", "-")
+        response.headers["X-Request-ID"] = request_id
+        status = response.status_code
+        if status < 400 and (
+            LOG_REQUEST_SAMPLE_RATE < 1 and random.random() >= LOG_REQUEST_SAMPLE_RATE
+            or not logger.isEnabledFor(logging.INFO)
+        ):
+            return response
+        duration_ms = (time.perf_counter() - getattr(g, "request_start", 0)) * 1000
         extra = {"request_id": request_id}
         log_msg = "%s %s %s %.1fms"
-        log_args = (request.method, request.path, response.status_code, duration_ms)
-        if response.status_code >= 400:
+        log_args = (request.method, request.path, status, duration_ms)
+        if ACCESS_LOG == "merged":
+            # What gunicorn's access log line would have added
+            extra.update(
+                client=request.headers.get("X-Forwarded-For", request.remote_addr),
+                bytes=response.calculate_content_length(),
+                user_agent=request.user_agent.string,
+            )
+            log_msg = "%s %s %s %.1fms %s"
+            log_args += (extra["client"],)
+        if status >= 400:
             logger.warning(log_msg, *log_args, extra=extra)
         else:
             logger.info(log_msg, *log_args, extra=extra)
-        response.headers["X-Request-ID"] = request_id
         return response
@@ -6,13 +6,17 @@ from alembic import context
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
+from dotenv import load_dotenv
+
+load_dotenv()
+
 from config import SQLALCHEMY_DATABASE_URI
 from app.extensions import db
 
 # Import all models so db.metadata has every table
-from app.auth.models import User  # noqa: F401
+from app.auth.models import RevokedToken, User  # noqa: F401
 from app.zones.models import WeatherZone  # noqa: F401
-from app.weather.models import WeatherCache  # noqa: F401
+from app.weather.models import Location, WeatherCache, WeatherForecast  # noqa: F401
 
 config = context.config
 if config.config_file_name is not None:
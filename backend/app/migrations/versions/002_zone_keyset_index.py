@@ -0,0 +1,37 @@
+"""Zone list keyset index: (user_id, updated_at, id) on weather_zones.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 00:00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination seeks on updated_at; rows with NULL would never be reached.
+    op.execute(
+        sa.text(
+            "UPDATE weather_zones SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+            "WHERE updated_at IS NULL"
+        )
+    )
+    op.create_index(
+        "ix_weather_zones_user_updated_id",
+        "weather_zones",
+        ["user_id", "updated_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weather_zones_user_updated_id", "weather_zones")
@@ -0,0 +1,146 @@
+"""Shared locations: locations table, location_id on weather_zones and weather_cache.
+
+Backfills one location per distinct rounded lat/lon of existing zones and latlon:
+weather cache keys, then points zones and weather rows at them.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 500
+
+locations = sa.table(
+    "locations",
+    sa.column("id", sa.Integer),
+    sa.column("location_key", sa.String),
+    sa.column("latitude", sa.Float),
+    sa.column("longitude", sa.Float),
+    sa.column("created_at", sa.DateTime),
+)
+weather_zones = sa.table(
+    "weather_zones",
+    sa.column("latitude", sa.Float),
+    sa.column("longitude", sa.Float),
+    sa.column("location_id", sa.Integer),
+)
+weather_cache = sa.table(
+    "weather_cache",
+    sa.column("location_key", sa.String),
+    sa.column("location_id", sa.Integer),
+)
+
+
+def _key(lat: float, lon: float) -> str:
+    # Same format as app.weather.models._location_key
+    return f"latlon:{lat:.4f},{lon:.4f}"
+
+
+def _backfill() -> None:
+    conn = op.get_bind()
+    points: dict[str, tuple[float, float]] = {}
+    zone_coords = conn.execute(
+        sa.select(weather_zones.c.latitude, weather_zones.c.longitude)
+        .where(
+            weather_zones.c.latitude.isnot(None),
+            weather_zones.c.longitude.isnot(None),
+        )
+        .distinct()
+    ).all()
+    for lat, lon in zone_coords:
+        points.setdefault(_key(lat, lon), (round(lat, 4), round(lon, 4)))
+    for (key,) in conn.execute(
+        sa.select(weather_cache.c.location_key).where(
+            weather_cache.c.location_key.like("latlon:%")
+        )
+    ):
+        try:
+            lat, lon = (float(part) for part in key[len("latlon:") :].split(","))
+        except ValueError:
+            continue
+        points.setdefault(key, (lat, lon))
+
+    now = datetime.utcnow()
+    rows = [
+        {"location_key": key, "latitude": lat, "longitude": lon, "created_at": now}
+        for key, (lat, lon) in points.items()
+    ]
+    for i in range(0, len(rows), _BATCH):
+        conn.execute(locations.insert(), rows[i : i + _BATCH])
+
+    ids = dict(conn.execute(sa.select(locations.c.location_key, locations.c.id)).all())
+    # One UPDATE per distinct zone coordinate pair (executemany)
+    updates = [
+        {"b_lat": lat, "b_lon": lon, "b_id": ids[_key(lat, lon)]}
+        for lat, lon in zone_coords
+    ]
+    stmt = (
+        weather_zones.update()
+        .where(
+            weather_zones.c.latitude == sa.bindparam("b_lat"),
+            weather_zones.c.longitude == sa.bindparam("b_lon"),
+        )
+        .values(location_id=sa.bindparam("b_id"))
+    )
+    for i in range(0, len(updates), _BATCH):
+        conn.execute(stmt, updates[i : i + _BATCH])
+    conn.execute(
+        weather_cache.update().values(
+            location_id=sa.select(locations.c.id)
+            .where(locations.c.location_key == weather_cache.c.location_key)
+            .scalar_subquery()
+        )
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "locations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("location_key", sa.String(120), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_locations_location_key"), "locations", ["location_key"], unique=True
+    )
+    with op.batch_alter_table("weather_zones") as batch:
+        batch.add_column(sa.Column("location_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "fk_weather_zones_location_id", "locations", ["location_id"], ["id"]
+        )
+        batch.create_index("ix_weather_zones_location_id", ["location_id"])
+    with op.batch_alter_table("weather_cache") as batch:
+        batch.add_column(sa.Column("location_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "fk_weather_cache_location_id", "locations", ["location_id"], ["id"]
+        )
+        batch.create_index("ix_weather_cache_location_id", ["location_id"])
+    _backfill()
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("weather_cache") as batch:
+        batch.drop_index("ix_weather_cache_location_id")
+        batch.drop_constraint("fk_weather_cache_location_id", type_="foreignkey")
+        batch.drop_column("location_id")
+    with op.batch_alter_table("weather_zones") as batch:
+        batch.drop_index("ix_weather_zones_location_id")
+        batch.drop_constraint("fk_weather_zones_location_id", type_="foreignkey")
+        batch.drop_column("location_id")
+    op.drop_index(op.f("ix_locations_location_key"), "locations")
+    op.drop_table("locations")
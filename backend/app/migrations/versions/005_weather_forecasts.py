@@ -0,0 +1,51 @@
+"""Weather forecasts: weather_forecasts (one packed-array record per location).
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 00:00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weather_forecasts",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("location_key", sa.String(120), nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=True),
+        sa.Column("slots", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("cached_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["location_id"], ["locations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_weather_forecasts_location_key"),
+        "weather_forecasts",
+        ["location_key"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_weather_forecasts_location_id"), "weather_forecasts", ["location_id"]
+    )
+    op.create_index(
+        op.f("ix_weather_forecasts_expires_at"), "weather_forecasts", ["expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_weather_forecasts_expires_at"), "weather_forecasts")
+    op.drop_index(op.f("ix_weather_forecasts_location_id"), "weather_forecasts")
+    op.drop_index(op.f("ix_weather_forecasts_location_key"), "weather_forecasts")
+    op.drop_table("weather_forecasts")
@@ -0,0 +1,96 @@
+"""App factory support: load api/openapi.yaml, from a pre-built JSON cache when fresh.
+
+Rendering the YAML and validating it against the OpenAPI schema are most of
+Connexion's per-boot spec cost. The build step (scripts/build_openapi_cache.py, run at
+image build) renders and parses the spec, has Connexion validate it, and writes
+CACHE_FILE next to it with a fingerprint of its inputs. While the fingerprint matches,
+create_app() loads that JSON and add_api skips the schema validation (api_spec()); a
+missing or stale cache only means parsing the YAML (with libyaml when available) and
+validating it as before. Connexion still resolves $refs and builds the operations.
+"""
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+SPEC_FILE = "openapi.yaml"
+CACHE_FILE = "openapi.cache.json"
+# Jinja arguments for the spec template (Connexion's add_api(arguments=...))
+SPEC_ARGUMENTS = {"title": "Weather App API"}
+
+
+def _fingerprint(source: bytes, arguments: dict) -> str:
+    import connexion
+
+    digest = hashlib.sha256(source)
+    digest.update(connexion.__version__.encode())
+    digest.update(json.dumps(arguments, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _render(source: bytes, arguments: dict) -> dict:
+    """Render and parse the spec the way Connexion does (Jinja, then safe YAML)."""
+    import jinja2
+    import yaml
+
+    text = jinja2.Template(source.decode("utf-8", "replace")).render(**arguments)
+    return yaml.load(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def _load(spec_dir: Path, arguments: dict) -> tuple[dict, bool]:
+    """(spec dict, whether it came from a current cache, i.e. is already validated)."""
+    source = (spec_dir / SPEC_FILE).read_bytes()
+    try:
+        cached = json.loads((spec_dir / CACHE_FILE).read_bytes())
+    except (OSError, ValueError):
+        cached = None
+    if cached and cached.get("fingerprint") == _fingerprint(source, arguments):
+        return cached["spec"], True
+    return _render(source, arguments), False
+
+
+def load_spec(spec_dir: Path, arguments: dict = SPEC_ARGUMENTS) -> dict:
+    """Rendered spec dict for Connexion's add_api (cached copy if still current)."""
+    return _load(spec_dir, arguments)[0]
+
+
+@contextmanager
+def api_spec(spec_dir: Path, arguments: dict = SPEC_ARGUMENTS):
+    """
+    Yield the spec dict for an add_api call made inside the block. When it is the
+    cached copy, build_cache already validated it, so Connexion's schema validation
+    is turned off for the block (app boot is single-threaded).
+    """
+    spec, validated = _load(spec_dir, arguments)
+    if not validated:
+        yield spec
+        return
+    from connexion.spec import OpenAPISpecification
+
+    OpenAPISpecification._validate_spec = classmethod(lambda cls, spec: None)
+    try:
+        yield spec
+    finally:
+        # Back to the inherited Specification._validate_spec
+        del OpenAPISpecification._validate_spec
+
+
+def build_cache(spec_dir: Path, arguments: dict = SPEC_ARGUMENTS) -> Path:
+    """Validate the spec and write its cache (raises InvalidSpecification)."""
+    from connexion.spec import Specification
+
+    source = (spec_dir / SPEC_FILE).read_bytes()
+    spec = _render(source, arguments)
+    Specification.from_dict(spec)
+    path = spec_dir / CACHE_FILE
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(
+        json.dumps(
+            {"fingerprint": _fingerprint(source, arguments), "spec": spec},
+            default=str,
+        )
+    )
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,270 @@
+"""Shared infra: hybrid rate-limit storage (local counters, batched Redis sync).
+
+Registered with limits under two schemes, so it is selected by RATELIMIT_STORAGE_URL:
+
+- ``hybrid+redis://host:6379/0``: each worker counts hits in memory and a background
+  thread pushes the deltas to Redis every RATELIMIT_SYNC_SECONDS in one pipelined
+  round trip, reading back the global counts and window expiries.
+- ``hybrid+memory://name``: the same, synced to an in-process stand-in for Redis
+  (shared by every storage with the same URL). Used by tests and benchmarks.
+
+Requests never wait on Redis. The price is a bounded overshoot: a worker does not see
+other workers' hits until its next sync, so a limit may be exceeded by at most the
+hits the other workers admit within one sync interval. Only the fixed-window strategy
+(flask-limiter's default) is supported.
+"""
+
+import os
+import threading
+import time
+
+from limits.storage import Storage
+
+from app.cache import get_redis
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+REDIS_PREFIX = "weatherapp:ratelimit:"
+DEFAULT_SYNC_SECONDS = 0.25
+
+# INCRBY the delta, start the window on first sight; return [count, ms to expiry]
+_SYNC_SCRIPT = """
+local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 then
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+  ttl = tonumber(ARGV[2])
+end
+return {count, ttl}
+"""
+
+
+class MemoryRemote:
+    """In-process stand-in for the Redis side: key -> [count, expires_at]."""
+
+    def __init__(self):
+        self._counts: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.round_trips = 0
+
+    def apply(self, batch: list[tuple[str, int, int]]) -> list[tuple[int, float]]:
+        """Add each (key, delta, expiry) and return (count, expires_at) per key."""
+        now = time.time()
+        results = []
+        with self._lock:
+            self.round_trips += 1
+            for key, delta, expiry in batch:
+                entry = self._counts.get(key)
+                if entry is None or entry[1] <= now:
+                    entry = self._counts[key] = [0, now + expiry]
+                entry[0] += delta
+                results.append((entry[0], entry[1]))
+        return results
+
+    def check(self) -> bool:
+        return True
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def reset(self) -> int:
+        with self._lock:
+            count = len(self._counts)
+            self._counts.clear()
+        return count
+
+
+class RedisRemote:
+    """Redis side: one pipeline (transaction-free) of a small script per key."""
+
+    def __init__(self, url: str):
+        self.client = get_redis(url)
+        self._script = self.client.register_script(_SYNC_SCRIPT)
+        self.round_trips = 0
+
+    def apply(self, batch: list[tuple[str, int, int]]) -> list[tuple[int, float]]:
+        pipe = self.client.pipeline(transaction=False)
+        for key, delta, expiry in batch:
+            self._script(
+                keys=[REDIS_PREFIX + key], args=[delta, expiry * 1000], client=pipe
+            )
+        now = time.time()
+        replies = pipe.execute()
+        self.round_trips += 1
+        return [(int(count), now + int(ttl) / 1000) for count, ttl in replies]
+
+    def check(self) -> bool:
+        try:
+            return bool(self.client.ping())
+        except Exception:
+            return False
+
+    def clear(self, key: str) -> None:
+        self.client.delete(REDIS_PREFIX + key)
+
+    def reset(self) -> int:
+        keys = list(self.client.scan_iter(match=REDIS_PREFIX + "*", count=1000))
+        if keys:
+            self.client.delete(*keys)
+        return len(keys)
+
+
+_memory_remotes: dict[str, MemoryRemote] = {}
+_memory_lock = threading.Lock()
+
+
+def _memory_remote(name: str) -> MemoryRemote:
+    with _memory_lock:
+        return _memory_remotes.setdefault(name, MemoryRemote())
+
+
+class _Window:
+    """One key's fixed window as seen by this worker."""
+
+    __slots__ = ("expiry", "expires_at", "synced", "in_flight", "pending")
+
+    def __init__(self, expiry: int, expires_at: float):
+        self.expiry = expiry
+        self.expires_at = expires_at
+        self.synced = 0  # global count at the last sync (includes our synced hits)
+        self.in_flight = 0  # our hits being pushed by the running sync
+        self.pending = 0  # our hits since then
+
+    def count(self) -> int:
+        return self.synced + self.in_flight + self.pending
+
+
+class HybridStorage(Storage):
+    """limits storage: local fixed-window counters reconciled with a shared backend."""
+
+    STORAGE_SCHEME = ["hybrid+redis", "hybrid+memory"]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        sync_interval: float = DEFAULT_SYNC_SECONDS,
+        **options,
+    ):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        remote_uri = uri.split("+", 1)[1]
+        if remote_uri.startswith("memory://"):
+            self.remote = _memory_remote(remote_uri)
+        else:
+            self.remote = RedisRemote(remote_uri)
+        self.sync_interval = float(sync_interval)
+        self._windows: dict[str, _Window] = {}
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+
+    @property
+    def base_exceptions(self):
+        if isinstance(self.remote, RedisRemote):
+            from redis.exceptions import RedisError
+
+            return RedisError
+        return ()
+
+    def _live(self, key: str, now: float) -> _Window | None:
+        window = self._windows.get(key)
+        if window is not None and window.expires_at <= now:
+            return None
+        return window
+
+    def _ensure_sync_thread(self) -> None:
+        """Start the sync thread in this process (again after fork)."""
+        if self._pid == os.getpid():
+            return
+        self._windows.clear()
+        self._pid = os.getpid()
+        if self.sync_interval > 0:
+            threading.Thread(
+                target=self._sync_loop, daemon=True, name="ratelimit-sync"
+            ).start()
+
+    def _sync_loop(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.sync_interval)
+            self.sync()
+
+    def sync(self) -> None:
+        """Push pending hits and pull global counts for every live key (one trip)."""
+        now = time.time()
+        batch = []
+        windows = []
+        with self._lock:
+            for key, window in list(self._windows.items()):
+                if window.expires_at <= now and not window.pending:
+                    del self._windows[key]
+                    continue
+                window.in_flight, window.pending = window.pending, 0
+                batch.append((key, window.in_flight, window.expiry))
+                windows.append(window)
+        if not batch:
+            return
+        try:
+            results = self.remote.apply(batch)
+        except Exception:
+            logger.warning(
+                "rate limit sync failed; keeping local counts", exc_info=True
+            )
+            with self._lock:
+                for window in windows:
+                    window.pending += window.in_flight
+                    window.in_flight = 0
+            return
+        with self._lock:
+            for (key, _, _), window, (count, expires_at) in zip(
+                batch, windows, results
+            ):
+                # Skip windows replaced (expired locally) while the sync ran
+                if self._windows.get(key) is window:
+                    window.synced = count
+                    window.in_flight = 0
+                    window.expires_at = expires_at
+
+    def incr(
+        self,
+        key: str,
+        expiry: int,
+        amount: int = 1,
+        elastic_expiry: bool = False,
+        **kwargs,
+    ) -> int:
+        # elastic_expiry (limits < 4) and any newer keyword are accepted so a limits
+        # upgrade cannot break every request; windows stay fixed either way
+        now = time.time()
+        with self._lock:
+            self._ensure_sync_thread()
+            window = self._live(key, now)
+            if window is None:
+                window = self._windows[key] = _Window(expiry, now + expiry)
+            window.pending += amount
+            return window.count()
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            window = self._live(key, time.time())
+            return window.count() if window is not None else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        with self._lock:
+            window = self._live(key, now)
+            return window.expires_at if window is not None else now
+
+    def check(self) -> bool:
+        return self.remote.check()
+
+    def reset(self) -> int | None:
+        with self._lock:
+            self._windows.clear()
+        return self.remote.reset()
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._windows.pop(key, None)
+        self.remote.clear(key)
@@ -0,0 +1,143 @@
+"""Request validation: Connexion parameter validator, schemas compiled per operation.
+
+Connexion's stock ParameterValidator deep-copies each parameter's schema and builds a
+new jsonschema validator for it on every request. This one does that once per
+operation. Parameters with simple scalar schemas (type plus bounds, lengths, enum)
+are checked with plain comparisons; a value that fails the quick check is handed to
+the compiled jsonschema validator, so error messages (and the 400s that
+register_error_handlers renders from them) are exactly Connexion's.
+"""
+
+import copy
+import re
+
+from connexion.decorators.validation import (
+    ParameterValidator,
+    TypeValidationError,
+    coerce_type,
+    validate_parameter_list,
+)
+from connexion.utils import is_null, is_nullable
+from jsonschema import Draft4Validator, ValidationError, draft4_format_checker
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Keywords the quick check understands; any other keyword means jsonschema only
+_SIMPLE_KEYWORDS = {
+    "type",
+    "minimum",
+    "maximum",
+    "exclusiveMinimum",
+    "exclusiveMaximum",
+    "minLength",
+    "maxLength",
+    "enum",
+    "pattern",
+    "default",
+    "nullable",
+    "description",
+    "example",
+}
+_TYPE_CHECKS = {
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+}
+
+
+def _quick_check(schema: dict):
+    """Predicate that returns True only for values schema certainly accepts, or None."""
+    if not set(schema) <= _SIMPLE_KEYWORDS or schema.get("type") not in _TYPE_CHECKS:
+        return None
+    if not all(
+        isinstance(schema.get(key, False), bool)
+        for key in ("exclusiveMinimum", "exclusiveMaximum")
+    ):
+        return None
+    if schema["type"] != "string" and {"minLength", "maxLength", "pattern"} & set(
+        schema
+    ):
+        return None
+    checks = [_TYPE_CHECKS[schema["type"]]]
+    if "minimum" in schema:
+        low = schema["minimum"]
+        if schema.get("exclusiveMinimum"):
+            checks.append(lambda v: v > low)
+        else:
+            checks.append(lambda v: v >= low)
+    if "maximum" in schema:
+        high = schema["maximum"]
+        if schema.get("exclusiveMaximum"):
+            checks.append(lambda v: v < high)
+        else:
+            checks.append(lambda v: v <= high)
+    if "minLength" in schema:
+        checks.append(lambda v: len(v) >= schema["minLength"])
+    if "maxLength" in schema:
+        checks.append(lambda v: len(v) <= schema["maxLength"])
+    if "enum" in schema:
+        allowed = [value for value in schema["enum"] if isinstance(value, str)]
+        if len(allowed) != len(schema["enum"]):
+            return None
+        checks.append(lambda v: isinstance(v, str) and v in allowed)
+    if "pattern" in schema:
+        search = re.compile(schema["pattern"]).search
+        checks.append(lambda v: search(v) is not None)
+    return lambda value: all(check(value) for check in checks)
+
+
+class _CompiledParameter:
+    __slots__ = ("validator", "quick")
+
+    def __init__(self, param: dict):
+        schema = copy.deepcopy(param.get("schema", param))
+        schema.pop("required", None)
+        self.validator = Draft4Validator(schema, format_checker=draft4_format_checker)
+        self.quick = _quick_check(schema)
+
+
+class CompiledParameterValidator(ParameterValidator):
+    """ParameterValidator with schemas compiled once (add_api validator_map)."""
+
+    def __init__(self, parameters, api, strict_validation=False):
+        super().__init__(parameters, api, strict_validation=strict_validation)
+        self._compiled = {
+            (param["in"], param["name"]): _CompiledParameter(param)
+            for params in self.parameters.values()
+            for param in params
+        }
+        self._query_names = frozenset(p["name"] for p in self.parameters["query"])
+
+    def validate_query_parameter_list(self, request):
+        return validate_parameter_list(request.query.keys(), self._query_names)
+
+    def validate_parameter(self, parameter_type, value, param, param_name=None):
+        compiled = self._compiled.get((param.get("in"), param.get("name")))
+        if compiled is None or parameter_type == "formdata":
+            return ParameterValidator.validate_parameter(
+                parameter_type, value, param, param_name
+            )
+        if value is None:
+            if param.get("required"):
+                return f"Missing {parameter_type} parameter '{param['name']}'"
+            return None
+        if is_nullable(param) and is_null(value):
+            return None
+        try:
+            converted_value = coerce_type(param, value, parameter_type, param_name)
+        except TypeValidationError as e:
+            return str(e)
+        if compiled.quick is not None and compiled.quick(converted_value):
+            return None
+        try:
+            compiled.validator.validate(converted_value)
+        except ValidationError as exception:
+            logger.info("invalid %s parameter %s", parameter_type, param.get("name"))
+            return str(exception)
+        return None
+
+
+VALIDATOR_MAP = {"parameter": CompiledParameterValidator}
@@ -1,9 +1,23 @@
-"""Weather: WeatherCache model."""
+"""Weather: Location, WeatherCache and WeatherForecast models."""
 
+import math
+import struct
 from datetime import datetime
 
 from app.extensions import db
 
+# WeatherForecast.data: one little-endian array per field, slots entries each, in
+# this order. Missing values are NaN (floats) or 255 (humidity).
+FORECAST_ARRAYS = (
+    ("time", "q"),  # unix seconds (UTC)
+    ("temperature_c", "f"),
+    ("humidity", "B"),
+    ("wind_speed_kmh", "f"),
+)
+_MISSING = {"f": math.nan, "B": 255}
+# Each forecast slot covers this long from its time
+FORECAST_SLOT_SECONDS = 3 * 3600
+
 
 def _location_key(lat=None, lon=None, city=None, country=None):
     if lat is not None and lon is not None:
@@ -11,11 +25,27 @@ def _location_key(lat=None, lon=None, city=None, country=None):
     return f"city:{city or ''},{country or ''}"
 
 
+class Location(db.Model):
+    """A lat/lon point (rounded as in its location_key), shared by all zones there."""
+
+    __tablename__ = "locations"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    location_key = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class WeatherCache(db.Model):
     __tablename__ = "weather_cache"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     location_key = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    # Set for latlon: keys; zones join their weather through it
+    location_id = db.Column(
+        db.Integer, db.ForeignKey("locations.id"), nullable=True, index=True
+    )
     temperature_c = db.Column(db.Float, nullable=True)
     humidity = db.Column(db.Integer, nullable=True)
     conditions = db.Column(db.String(200), nullable=True)
@@ -33,5 +63,68 @@ class WeatherCache(db.Model):
             "humidity": self.humidity,
             "conditions": self.conditions,
             "wind_speed_kmh": self.wind_speed_kmh,
-            "cached_at": self.cached_at.isoformat() if self.cached_at else None,
+            "cached_at": self.cached_at,
         }
+
+
+class WeatherForecast(db.Model):
+    """A location's forecast (time slots) as one record of packed fixed-width arrays."""
+
+    __tablename__ = "weather_forecasts"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    location_key = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    location_id = db.Column(
+        db.Integer, db.ForeignKey("locations.id"), nullable=True, index=True
+    )
+    slots = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    cached_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+def pack_forecast(slots: list[dict]) -> bytes:
+    """WeatherForecast.data for slot dicts with the FORECAST_ARRAYS fields."""
+    n = len(slots)
+    parts = []
+    for field, code in FORECAST_ARRAYS:
+        values = [slot.get(field) for slot in slots]
+        if code == "B":
+            values = [v if v is None else max(0, min(100, int(v))) for v in values]
+        parts.append(
+            struct.pack(
+                f"<{n}{code}", *(_MISSING[code] if v is None else v for v in values)
+            )
+        )
+    return b"".join(parts)
+
+
+def unpack_forecast(
+    data: bytes,
+    slots: int,
+    start: int = 0,
+    stop: int | None = None,
+    fields: tuple[str, ...] | None = None,
+) -> dict[str, list]:
+    """
+    Slots start:stop of packed forecast data as {field: values}. Only that slice of
+    each array is unpacked; fields limits the arrays read.
+    """
+    stop = slots if stop is None else max(0, min(stop, slots))
+    start = max(0, min(start, stop))
+    out = {}
+    offset = 0
+    for field, code in FORECAST_ARRAYS:
+        width = struct.calcsize(code)
+        if fields is None or field in fields:
+            values = struct.unpack_from(
+                f"<{stop - start}{code}", data, offset + start * width
+            )
+            if code == "f":
+                # float32 back to the API's precision
+                values = [None if math.isnan(v) else round(v, 2) for v in values]
+            elif code == "B":
+                values = [None if v == 255 else v for v in values]
+            out[field] = list(values)
+        offset += slots * width
+    return out
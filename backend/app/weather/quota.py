@@ -0,0 +1,113 @@
+"""Weather: OpenWeatherMap call budget shared by all workers (token bucket).
+
+OPENWEATHERMAP_CALLS_PER_MINUTE is the API key's quota. The bucket holds one minute
+of it and refills continuously. With REDIS_URL it lives in Redis (one script call per
+take), so every worker and host draws from it; without, it lives in shared memory
+created by create_app(), which all gunicorn workers forked from a preloading master
+share (without preload_app each worker has a bucket of its own).
+
+Each upstream call takes a token for its priority class. A class may not take the
+share of the bucket reserved for the classes above it: search leaves 20% to
+interactive fetches, background prefetch leaves 50% to both. When try_acquire() says
+no, callers serve cached data (or nothing) instead of calling anyway.
+"""
+
+import multiprocessing
+import time
+
+from flask import current_app
+
+from app.cache import get_redis
+from app.integrations.openweathermap import OpenWeatherMapError
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+INTERACTIVE = "interactive"
+SEARCH = "search"
+PREFETCH = "prefetch"
+# Share of the bucket each class must leave for the classes above it
+_RESERVE = {INTERACTIVE: 0.0, SEARCH: 0.2, PREFETCH: 0.5}
+
+REDIS_KEY = "weatherapp:owm:bucket"
+
+# Refill by the time elapsed (Redis clock), then take a token if floor still remains
+_TAKE_SCRIPT = """
+local now = redis.call('TIME')
+local t = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or t
+tokens = math.min(capacity, tokens + math.max(0, t - ts) * tonumber(ARGV[2]))
+local ok = 0
+if tokens - 1 >= tonumber(ARGV[3]) then
+  tokens = tokens - 1
+  ok = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(t))
+redis.call('EXPIRE', KEYS[1], 120)
+return ok
+"""
+_scripts: dict[int, object] = {}
+
+
+class QuotaExhausted(OpenWeatherMapError):
+    """No budget left for this priority class; the call was not made."""
+
+
+class SharedBucket:
+    """Token bucket in shared memory: inherited, not copied, by forked workers."""
+
+    def __init__(self):
+        # tokens (negative: full on first use), time of the last refill
+        self._state = multiprocessing.RawArray("d", [-1.0, 0.0])
+        self._lock = multiprocessing.Lock()
+
+    def take(self, capacity: float, rate: float, floor: float) -> bool:
+        with self._lock:
+            now = time.time()
+            tokens, last = self._state[0], self._state[1]
+            if tokens < 0:
+                tokens = capacity
+            else:
+                tokens = min(capacity, tokens + max(0.0, now - last) * rate)
+            ok = tokens - 1 >= floor
+            if ok:
+                tokens -= 1
+            self._state[0], self._state[1] = tokens, now
+            return ok
+
+
+def _redis_take(client, capacity: float, rate: float, floor: float) -> bool:
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts.setdefault(id(client), client.register_script(_TAKE_SCRIPT))
+    return bool(script(keys=[REDIS_KEY], args=[capacity, rate, floor]))
+
+
+def try_acquire(priority: str = INTERACTIVE) -> bool:
+    """Take one upstream call from the budget for priority. False: do not call."""
+    per_minute = current_app.config.get("OPENWEATHERMAP_CALLS_PER_MINUTE") or 0
+    if per_minute <= 0:
+        return True
+    capacity = float(per_minute)
+    rate = per_minute / 60.0
+    floor = capacity * _RESERVE[priority]
+    ok = None
+    client = get_redis()
+    if client is not None:
+        try:
+            ok = _redis_take(client, capacity, rate, floor)
+        except Exception as e:
+            logger.warning("quota check in Redis failed, using local bucket: %s", e)
+    if ok is None:
+        ok = current_app.extensions["owm_quota"].take(capacity, rate, floor)
+    if not ok:
+        logger.info("OpenWeatherMap budget exhausted for %s calls", priority)
+    return ok
+
+
+def init_quota(flask_app) -> None:
+    """Create the shared-memory bucket (before gunicorn forks, with preload_app)."""
+    flask_app.extensions["owm_quota"] = SharedBucket()
@@ -1,22 +1,128 @@
 """Weather: search cities, get current weather with cache (TTL) and fallback."""
 
+import bisect
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 
 from flask import current_app
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 
+from app import events
+from app.cache import get_local_cache
 from app.extensions import db
 from app.integrations.openweathermap import (
     OpenWeatherMapError,
     current_weather,
+    forecast,
     search_cities,
 )
-from app.weather.models import WeatherCache
+from app.weather import quota
+from app.weather.models import (
+    FORECAST_SLOT_SECONDS,
+    Location,
+    WeatherCache,
+    WeatherForecast,
+    pack_forecast,
+    unpack_forecast,
+)
 
 # Short in-memory cache for search (dedupe rapid identical requests; TTL 5s)
 _SEARCH_CACHE: dict[str, tuple[list[dict], float]] = {}
 _SEARCH_CACHE_TTL = 5.0
 
+# Upstream fetches of bulk refreshes, shared by all requests in this process:
+# WEATHER_REFRESH_CONCURRENCY threads at most, however many refreshes run at once
+_refresh_executor: ThreadPoolExecutor | None = None
+_refresh_lock = threading.Lock()
+
+
+def _get_refresh_executor(workers: int) -> ThreadPoolExecutor:
+    global _refresh_executor
+    if _refresh_executor is None:
+        with _refresh_lock:
+            if _refresh_executor is None:
+                _refresh_executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="weather-refresh"
+                )
+    return _refresh_executor
+
+
+def reset_after_fork() -> None:
+    """Drop the refresh executor inherited from a preloading parent."""
+    global _refresh_executor, _refresh_lock
+    _refresh_executor = None
+    _refresh_lock = threading.Lock()
+
+
+def weather_topic(location_key: str) -> str:
+    """Pub/sub topic carrying fresh weather for a cache location key."""
+    return f"weather:{location_key}"
+
+
+def publish_weather_update(location_key: str, weather: dict) -> None:
+    """Push a fresh cache entry to live subscribers (e.g. SSE clients)."""
+    try:
+        events.publish(weather_topic(location_key), weather)
+    except Exception:
+        current_app.logger.warning("weather update publish failed", exc_info=True)
+
+
+def _location_ids(keys: list[str]) -> dict[str, int]:
+    ids = {}
+    for i in range(0, len(keys), 500):
+        rows = db.session.query(Location.location_key, Location.id).filter(
+            Location.location_key.in_(keys[i : i + 500])
+        )
+        ids.update(rows)
+    return ids
+
+
+def ensure_locations(
+    coords: list[tuple[float, float]],
+) -> dict[tuple[float, float], int]:
+    """
+    Location ids for lat/lon pairs, inserting the locations that do not exist yet.
+    Commits when it inserts, so call it before adding anything else to the session.
+    Ids never change, so they are remembered per process.
+    """
+    known = get_local_cache("location_ids", max_entries=10_000)
+    points: dict[str, tuple[float, float]] = {}
+    for lat, lon in coords:
+        points.setdefault(WeatherCache.make_key(lat=lat, lon=lon), (lat, lon))
+    ids = {}
+    for key in points:
+        location_id = known.get(key)
+        if location_id is not None:
+            ids[key] = location_id
+    missing = [key for key in points if key not in ids]
+    if missing:
+        ids.update(_location_ids(missing))
+        new = [key for key in missing if key not in ids]
+        if new:
+            rows = [
+                {
+                    "location_key": key,
+                    "latitude": round(points[key][0], 4),
+                    "longitude": round(points[key][1], 4),
+                }
+                for key in new
+            ]
+            try:
+                db.session.execute(insert(Location), rows)
+                db.session.commit()
+            except IntegrityError:
+                # Another worker inserted some of them first; theirs are as good
+                db.session.rollback()
+            ids.update(_location_ids(new))
+        for key in missing:
+            known.set(key, ids[key], 86400)
+    return {
+        (lat, lon): ids[WeatherCache.make_key(lat=lat, lon=lon)] for lat, lon in coords
+    }
+
 
 def search_cities_query(query: str) -> list[dict]:
     """Search cities via OpenWeatherMap Geocoding. Returns [] if no key or on error. Dedupes within 5s."""
@@ -24,14 +130,15 @@ def search_cities_query(query: str) -> list[dict]:
     if not q:
         return []
     now = time.monotonic()
-    if q in _SEARCH_CACHE:
-        cached_result, expiry = _SEARCH_CACHE[q]
-        if expiry > now:
-            return cached_result
-        del _SEARCH_CACHE[q]
+    entry = _SEARCH_CACHE.get(q)
+    if entry is not None and entry[1] > now:
+        return entry[0]
     api_key = current_app.config.get("OPENWEATHERMAP_API_KEY") or ""
     if not api_key:
         return []
+    if not quota.try_acquire(quota.SEARCH):
+        # Over budget: an expired result is better than none
+        return entry[0] if entry is not None else []
     try:
         result = search_cities(api_key, query.strip())
         _SEARCH_CACHE[q] = (result, now + _SEARCH_CACHE_TTL)
@@ -40,10 +147,18 @@ def search_cities_query(query: str) -> list[dict]:
         return []
 
 
-def get_current_weather(lat: float, lon: float) -> dict | None:
+def get_current_weather(
+    lat: float,
+    lon: float,
+    force_refresh: bool = False,
+    priority: str = quota.INTERACTIVE,
+) -> dict | None:
     """
     Get current weather for lat/lon. Uses cache (TTL from config); calls API on miss.
     On API error, returns cached data if still valid, else None.
+    force_refresh skips the cache read and always calls the API (if a key is set).
+    The call is made only if the upstream budget allows it for priority; otherwise
+    this falls back to the cache as on an API error.
     """
     api_key = (current_app.config.get("OPENWEATHERMAP_API_KEY") or "").strip()
     ttl_min = current_app.config.get("WEATHER_CACHE_TTL_MINUTES") or 20
@@ -52,30 +167,38 @@ def get_current_weather(lat: float, lon: float) -> dict | None:
     expires_at = now + timedelta(minutes=ttl_min)
 
     # Try cache first
-    cached = (
-        db.session.query(WeatherCache)
-        .filter(
-            WeatherCache.location_key == location_key,
-            WeatherCache.expires_at > now,
+    cached = None
+    if not force_refresh or not api_key:
+        cached = (
+            db.session.query(WeatherCache)
+            .filter(
+                WeatherCache.location_key == location_key,
+                WeatherCache.expires_at > now,
+            )
+            .first()
         )
-        .first()
-    )
     if cached:
         return cached.to_dict()
 
     # Call API if we have a key
     if api_key:
         try:
+            if not quota.try_acquire(priority):
+                raise quota.QuotaExhausted("OpenWeatherMap budget exhausted")
             raw = current_weather(api_key, lat, lon)
             if raw:
+                location_id = ensure_locations([(lat, lon)])[(lat, lon)]
                 row = WeatherCache(
                     location_key=location_key,
+                    location_id=location_id,
                     temperature_c=raw.get("temperature_c"),
                     humidity=raw.get("humidity"),
                     conditions=raw.get("conditions"),
                     wind_speed_kmh=raw.get("wind_speed_kmh"),
                     expires_at=expires_at,
                 )
+                # Upsert: the lookup must see what the primary has, not a replica
+                db.session().use_primary()
                 existing = (
                     db.session.query(WeatherCache)
                     .filter(WeatherCache.location_key == location_key)
@@ -88,12 +211,16 @@ def get_current_weather(lat: float, lon: float) -> dict | None:
                     existing.wind_speed_kmh = row.wind_speed_kmh
                     existing.cached_at = now
                     existing.expires_at = expires_at
+                    existing.location_id = location_id
                 else:
                     db.session.add(row)
                 db.session.commit()
-                return (existing or row).to_dict()
+                weather = (existing or row).to_dict()
+                publish_weather_update(location_key, weather)
+                return weather
         except OpenWeatherMapError:
             # Fallback: return stale cache if any
+            db.session.rollback()
             stale = (
                 db.session.query(WeatherCache)
                 .filter(WeatherCache.location_key == location_key)
@@ -102,6 +229,8 @@ def get_current_weather(lat: float, lon: float) -> dict | None:
             if stale:
                 return stale.to_dict()
         except Exception:
+            # The failed session (e.g. a flush error) must be reset before reading
+            db.session.rollback()
             stale = (
                 db.session.query(WeatherCache)
                 .filter(WeatherCache.location_key == location_key)
@@ -111,3 +240,265 @@ def get_current_weather(lat: float, lon: float) -> dict | None:
                 return stale.to_dict()
 
     return None
+
+
+def get_cached_weather_many(
+    coords: list[tuple[float, float]],
+) -> dict[tuple[float, float], dict]:
+    """Unexpired cached weather for many lat/lon pairs in one query; misses omitted."""
+    now = datetime.utcnow()
+    # Several coordinates can round to the same cache key
+    keys: dict[str, list[tuple[float, float]]] = {}
+    for lat, lon in coords:
+        keys.setdefault(WeatherCache.make_key(lat=lat, lon=lon), []).append((lat, lon))
+    key_list = list(keys)
+    result = {}
+    # Chunked to stay well below MSSQL's 2100 bound-parameter limit
+    for i in range(0, len(key_list), 500):
+        rows = (
+            db.session.query(WeatherCache)
+            .filter(
+                WeatherCache.location_key.in_(key_list[i : i + 500]),
+                WeatherCache.expires_at > now,
+            )
+            .all()
+        )
+        for row in rows:
+            weather = row.to_dict()
+            for coord in keys[row.location_key]:
+                result[coord] = weather
+    return result
+
+
+def get_current_weather_many(
+    coords: list[tuple[float, float]], priority: str = quota.INTERACTIVE
+) -> dict[tuple[float, float], dict | None]:
+    """
+    Current weather for many lat/lon pairs: one cache query for all of them, then
+    get_current_weather (API call + cache write) only for the misses.
+    """
+    cached = get_cached_weather_many(coords)
+    return {
+        (lat, lon): (
+            cached[(lat, lon)]
+            if (lat, lon) in cached
+            else get_current_weather(lat, lon, priority=priority)
+        )
+        for lat, lon in dict.fromkeys(coords)
+    }
+
+
+def _store_weather_many(
+    raws: dict[str, dict], points: dict[str, tuple[float, float]], now: datetime
+) -> dict[str, dict]:
+    """Upsert fresh API results keyed by location_key with one SELECT and one commit."""
+    ttl_min = current_app.config.get("WEATHER_CACHE_TTL_MINUTES") or 20
+    expires_at = now + timedelta(minutes=ttl_min)
+    key_list = list(raws)
+    location_ids = ensure_locations([points[key] for key in key_list])
+    existing: dict[str, WeatherCache] = {}
+    for i in range(0, len(key_list), 500):
+        rows = (
+            db.session.query(WeatherCache)
+            .filter(WeatherCache.location_key.in_(key_list[i : i + 500]))
+            .all()
+        )
+        existing.update((row.location_key, row) for row in rows)
+    stored = {}
+    for key, raw in raws.items():
+        row = existing.get(key)
+        if row is None:
+            row = WeatherCache(location_key=key)
+            db.session.add(row)
+        row.temperature_c = raw.get("temperature_c")
+        row.humidity = raw.get("humidity")
+        row.conditions = raw.get("conditions")
+        row.wind_speed_kmh = raw.get("wind_speed_kmh")
+        row.cached_at = now
+        row.expires_at = expires_at
+        row.location_id = location_ids[points[key]]
+        stored[key] = row
+    db.session.commit()
+    result = {key: row.to_dict() for key, row in stored.items()}
+    for key, weather in result.items():
+        publish_weather_update(key, weather)
+    return result
+
+
+def refresh_weather_many(
+    coords: list[tuple[float, float]],
+    deadline: float | None = None,
+    priority: str = quota.INTERACTIVE,
+) -> dict[tuple[float, float], tuple[str, dict | None]]:
+    """
+    Force-refresh weather for many lat/lon pairs. Coordinates are deduped by cache
+    key and fetched concurrently (WEATHER_REFRESH_CONCURRENCY) until deadline seconds
+    have passed; results are written with one bulk cache update.
+
+    Returns {(lat, lon): (status, weather)} with status "refreshed", or "stale" /
+    "unavailable" when the fetch failed, missed the deadline or was over the upstream
+    budget (weather is then the last cached snapshot, if any).
+    """
+    api_key = (current_app.config.get("OPENWEATHERMAP_API_KEY") or "").strip()
+    if deadline is None:
+        deadline = current_app.config.get("WEATHER_REFRESH_DEADLINE_SECONDS") or 8
+    by_key: dict[str, list[tuple[float, float]]] = {}
+    for lat, lon in coords:
+        by_key.setdefault(WeatherCache.make_key(lat=lat, lon=lon), []).append(
+            (lat, lon)
+        )
+
+    raws: dict[str, dict] = {}
+    # Budget taken here: the fetch threads run without an app context
+    fetch = [key for key in by_key if api_key and quota.try_acquire(priority)]
+    if fetch:
+        pool = _get_refresh_executor(
+            current_app.config.get("WEATHER_REFRESH_CONCURRENCY") or 8
+        )
+        # Upstream calls only; DB work stays on the request thread
+        futures = {
+            pool.submit(current_weather, api_key, *by_key[key][0]): key for key in fetch
+        }
+        done, not_done = wait(futures, timeout=deadline)
+        # Drop our fetches still queued; running ones finish on the shared threads
+        for future in not_done:
+            future.cancel()
+        for future in done:
+            try:
+                raw = future.result()
+            except Exception:
+                continue
+            if raw:
+                raws[futures[future]] = raw
+
+    now = datetime.utcnow()
+    points = {key: points[0] for key, points in by_key.items()}
+    fresh = _store_weather_many(raws, points, now) if raws else {}
+    missing = [key for key in by_key if key not in fresh]
+    stale: dict[str, dict] = {}
+    for i in range(0, len(missing), 500):
+        rows = (
+            db.session.query(WeatherCache)
+            .filter(WeatherCache.location_key.in_(missing[i : i + 500]))
+            .all()
+        )
+        stale.update((row.location_key, row.to_dict()) for row in rows)
+
+    result = {}
+    for key, points in by_key.items():
+        if key in fresh:
+            entry = ("refreshed", fresh[key])
+        elif key in stale:
+            entry = ("stale", stale[key])
+        else:
+            entry = ("unavailable", None)
+        for point in points:
+            result[point] = entry
+    return result
+
+
+def get_current_weather_batch(
+    coords: list[tuple[float, float]],
+) -> dict[tuple[float, float], tuple[str, dict | None]]:
+    """
+    Current weather for many lat/lon pairs: one cache query for all of them, then the
+    misses fetched concurrently as in refresh_weather_many (same deadline).
+
+    Returns {(lat, lon): (status, weather)}: "cached" for cache hits, otherwise the
+    refresh_weather_many status ("refreshed", "stale" or "unavailable").
+    """
+    cached = get_cached_weather_many(coords)
+    misses = [coord for coord in dict.fromkeys(coords) if coord not in cached]
+    result = {coord: ("cached", weather) for coord, weather in cached.items()}
+    if misses:
+        result.update(refresh_weather_many(misses))
+    return result
+
+
+def _cached_forecast(location_key: str, unexpired: bool):
+    """(slots, data, cached_at) row of a location's forecast; no ORM entity."""
+    stmt = select(
+        WeatherForecast.slots, WeatherForecast.data, WeatherForecast.cached_at
+    ).where(WeatherForecast.location_key == location_key)
+    if unexpired:
+        stmt = stmt.where(WeatherForecast.expires_at > datetime.utcnow())
+    return db.session.execute(stmt).first()
+
+
+def _store_forecast(
+    location_key: str, lat: float, lon: float, slots: list[dict], now: datetime
+) -> tuple[int, bytes, datetime]:
+    ttl_min = current_app.config.get("WEATHER_CACHE_TTL_MINUTES") or 20
+    data = pack_forecast(slots)
+    values = {
+        "location_id": ensure_locations([(lat, lon)])[(lat, lon)],
+        "slots": len(slots),
+        "data": data,
+        "cached_at": now,
+        "expires_at": now + timedelta(minutes=ttl_min),
+    }
+    replace = (
+        update(WeatherForecast)
+        .where(WeatherForecast.location_key == location_key)
+        .values(**values)
+    )
+    if db.session.execute(replace).rowcount == 0:
+        try:
+            db.session.execute(
+                insert(WeatherForecast).values(location_key=location_key, **values)
+            )
+            db.session.commit()
+        except IntegrityError:
+            # Another worker inserted it first; ours is as fresh, so overwrite
+            db.session.rollback()
+            db.session.execute(replace)
+    db.session.commit()
+    return len(slots), data, now
+
+
+def get_forecast(
+    lat: float,
+    lon: float,
+    hours: int | None = None,
+    priority: str = quota.INTERACTIVE,
+) -> dict | None:
+    """
+    Forecast for lat/lon: {"cached_at", "slots": [{time, temperature_c, humidity,
+    wind_speed_kmh}]} from the slot covering now, limited to the next hours if given
+    (no slots if every cached slot is past).
+
+    Cached like get_current_weather: an unexpired record is served as is; otherwise
+    the API is called (within the upstream budget) and the record replaced; on API
+    error or without budget the expired record is served. None when there is none.
+    """
+    api_key = (current_app.config.get("OPENWEATHERMAP_API_KEY") or "").strip()
+    location_key = WeatherCache.make_key(lat=lat, lon=lon)
+    row = _cached_forecast(location_key, unexpired=True)
+    if row is None and api_key:
+        try:
+            if not quota.try_acquire(priority):
+                raise quota.QuotaExhausted("OpenWeatherMap budget exhausted")
+            slots = forecast(api_key, lat, lon)
+            if slots:
+                row = _store_forecast(location_key, lat, lon, slots, datetime.utcnow())
+        except OpenWeatherMapError:
+            # Fallback: the expired record, if any
+            row = _cached_forecast(location_key, unexpired=False)
+    if row is None:
+        return None
+
+    n, data, cached_at = row
+    times = unpack_forecast(data, n, fields=("time",))["time"]
+    now = time.time()
+    start = max(0, bisect.bisect_right(times, now) - 1)
+    if n and times[start] + FORECAST_SLOT_SECONDS <= now:
+        # That slot is over: start at the next one (none if the record is all past)
+        start += 1
+    stop = n if hours is None else bisect.bisect_right(times, now + hours * 3600)
+    columns = unpack_forecast(data, n, start, stop)
+    columns["time"] = [datetime.utcfromtimestamp(t) for t in columns["time"]]
+    fields = list(columns)
+    return {
+        "cached_at": cached_at,
+        "slots": [dict(zip(fields, values)) for values in zip(*columns.values())],
+    }
@@ -0,0 +1,60 @@
+"""Zones: per-user cache of zone list pages (zone rows only; weather is merged at read).
+
+Pages live in a process-local cache keyed by a per-user version counter held in the
+shared cache. Every zone write bumps the version, so all workers stop serving old
+pages on their next read. That needs REDIS_URL: without it the counter is per
+process, so ZONES_CACHE_ENABLED defaults to off (see config.py).
+"""
+
+from flask import current_app
+
+from app.cache import get_local_cache, get_shared_cache
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _enabled() -> bool:
+    return bool(current_app.config.get("ZONES_CACHE_ENABLED"))
+
+
+def _version_key(user_id: int) -> str:
+    return f"zones:ver:{user_id}"
+
+
+def _current_version(user_id: int) -> int | None:
+    """Version counter for user's zones, or None if the shared cache is unreachable."""
+    try:
+        return int(get_shared_cache().get(_version_key(user_id)) or 0)
+    except Exception:
+        logger.warning("zone cache version lookup failed", exc_info=True)
+        return None
+
+
+def get_page(user_id: int, page_key: str) -> tuple[int | None, dict | None]:
+    """Return (version, cached page or None). Pass version back to set_page."""
+    if not _enabled():
+        return None, None
+    version = _current_version(user_id)
+    if version is None:
+        return None, None
+    page = get_local_cache("zones").get(f"zones:{user_id}:{version}:{page_key}")
+    return version, page
+
+
+def set_page(user_id: int, version: int | None, page_key: str, page: dict) -> None:
+    """Store a page read at version (no-op if caching is off or version unknown)."""
+    if version is None or not _enabled():
+        return
+    ttl = current_app.config.get("ZONES_CACHE_TTL_SECONDS") or 60
+    get_local_cache("zones").set(f"zones:{user_id}:{version}:{page_key}", page, ttl)
+
+
+def invalidate(user_id: int) -> None:
+    """Bump the user's version so every worker's cached pages become unreachable."""
+    if not _enabled():
+        return
+    try:
+        get_shared_cache().incr(_version_key(user_id))
+    except Exception:
+        logger.warning("zone cache invalidation failed", exc_info=True)
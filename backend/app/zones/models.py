@@ -11,6 +11,8 @@ class WeatherZone(db.Model):
         db.UniqueConstraint(
             "user_id", "city_name", "country_code", name="uq_user_city_country"
         ),
+        # Covers list ordering (updated_at DESC, id DESC) and keyset seeks per user
+        db.Index("ix_weather_zones_user_updated_id", "user_id", "updated_at", "id"),
     )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -22,6 +24,10 @@ class WeatherZone(db.Model):
     country_code = db.Column(db.String(10), nullable=False)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
+    # Shared location (deduplicated across users) for zones with coordinates
+    location_id = db.Column(
+        db.Integer, db.ForeignKey("locations.id"), nullable=True, index=True
+    )
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -36,8 +42,9 @@ class WeatherZone(db.Model):
             "country_code": self.country_code,
             "latitude": self.latitude,
             "longitude": self.longitude,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            # datetimes as such: the JSON provider writes them in isoformat()
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
         if weather is not None:
             d["weather"] = weather
@@ -1,15 +1,97 @@
 """Zones: CRUD and ownership checks; attach weather when returning zones."""
 
+import base64
+import csv
+import io
+import json
+import math
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+
 from flask import current_app
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.exc import IntegrityError
 
+from app import background, json_provider
+from app.auth.models import User
 from app.extensions import db
-from app.weather.service import get_current_weather
+from app.weather.service import (
+    ensure_locations,
+    get_current_weather,
+    get_current_weather_many,
+    refresh_weather_many,
+    weather_topic,
+)
+from app.weather import quota
+from app.weather.models import WeatherCache
+from app.zones import cache as zone_cache
 from app.zones.models import WeatherZone
 
 # Pagination limits
 MIN_LIMIT = 1
 MAX_LIMIT = 100
 DEFAULT_LIMIT = 50
+# Bulk create/delete batch size (one transaction per batch)
+BULK_MAX_ITEMS = 500
+# Rows fetched per round trip (and weather lookups per query) while exporting
+EXPORT_CHUNK_SIZE = 500
+EXPORT_CSV_COLUMNS = (
+    "id",
+    "name",
+    "city_name",
+    "country_code",
+    "latitude",
+    "longitude",
+    "created_at",
+    "updated_at",
+    "temperature_c",
+    "humidity",
+    "conditions",
+    "wind_speed_kmh",
+    "weather_cached_at",
+)
+# Zone fields a client can select with ?fields= (the Zone schema without weather)
+ZONE_FIELDS = (
+    "id",
+    "user_id",
+    "name",
+    "city_name",
+    "country_code",
+    "latitude",
+    "longitude",
+    "created_at",
+    "updated_at",
+)
+# List order: null updated_at first, then newest. A CASE rather than NULLS FIRST,
+# which SQL Server does not have
+_LIST_ORDER = (
+    case((WeatherZone.updated_at.is_(None), 0), else_=1),
+    WeatherZone.updated_at.desc(),
+    WeatherZone.id.desc(),
+)
+# Rows per IN (...) clause; keeps well below MSSQL's 2100 bound-parameter limit
+_IN_CHUNK = 500
+
+
+def _is_duplicate_zone(error: IntegrityError) -> bool:
+    """True if error is a uq_user_city_country violation (not NOT NULL, FK, ...)."""
+    message = str(error.orig)
+    # SQLite names the columns, not the constraint
+    return "uq_user_city_country" in message or (
+        "weather_zones.user_id, weather_zones.city_name, weather_zones.country_code"
+        in message
+    )
+
+
+def _duplicate_key(city_name: str, country_code: str) -> tuple[str, str]:
+    """
+    (city, country) as uq_user_city_country compares them: case-insensitively under
+    MSSQL's default collation, exactly elsewhere. create leaves the check to the
+    constraint; bulk_create compares these keys, so both find the same duplicates.
+    """
+    if db.engine.dialect.name == "mssql":
+        return city_name.casefold(), country_code.casefold()
+    return city_name, country_code
 
 
 def _attach_weather(zone: WeatherZone) -> dict:
@@ -20,37 +102,305 @@ def _attach_weather(zone: WeatherZone) -> dict:
     return zone.to_dict(weather=weather)
 
 
+def _merge_weather(
+    zone_dicts: list[dict], weather_by_zone: dict[int, dict] | None = None
+) -> list[dict]:
+    """
+    Copy zone dicts (e.g. from the list cache) with weather: weather_by_zone (from a
+    query that joined it) where given, the rest resolved in bulk.
+    """
+    known = weather_by_zone or {}
+    coords = [
+        (z["latitude"], z["longitude"])
+        for z in zone_dicts
+        if z["id"] not in known
+        and z["latitude"] is not None
+        and z["longitude"] is not None
+    ]
+    weather_by_coord = get_current_weather_many(coords) if coords else {}
+    out = []
+    for z in zone_dicts:
+        weather = known.get(z["id"]) or weather_by_coord.get(
+            (z["latitude"], z["longitude"])
+        )
+        out.append({**z, "weather": weather} if weather is not None else dict(z))
+    return out
+
+
+def encode_cursor(updated_at: datetime | None, zone_id: int) -> str:
+    """Opaque keyset cursor for the (updated_at, id) position of a zone.
+
+    sort first in the list (_LIST_ORDER).
+    sort first in the list (NULLS FIRST, as Postgres orders DESC by default).
+    """
+    raw = json.dumps([updated_at.isoformat() if updated_at else None, zone_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int] | None:
+    """Parse a cursor from encode_cursor. Returns None if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, zone_id = json.loads(base64.urlsafe_b64decode(padded))
+        if updated_at is None:
+            return None, int(zone_id)
+        return datetime.fromisoformat(updated_at), int(zone_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_fields(
+    fields: tuple[str, ...] | None, include_weather: bool, *required: str
+) -> tuple[str, ...] | None:
+    """
+    Zone fields to read for a response with these fields (None: all): the requested
+    ones plus those the read itself needs (id and coordinates to merge weather).
+    """
+    if fields is None:
+        return None
+    wanted = {*fields, "id", *required}
+    if include_weather:
+        wanted.update(("latitude", "longitude"))
+    return tuple(name for name in ZONE_FIELDS if name in wanted)
+
+
+def _project(zone_dicts: list[dict], fields: tuple[str, ...]) -> list[dict]:
+    """Only the requested fields of each zone (and its weather, if merged in)."""
+    keep = (*fields, "weather")
+    return [{k: z[k] for k in keep if k in z} for z in zone_dicts]
+
+
 def list_for_user(
-    user_id: int, limit: int = DEFAULT_LIMIT, offset: int = 0
-) -> tuple[list[dict], int]:
+    user_id: int,
+    limit: int = DEFAULT_LIMIT,
+    offset: int = 0,
+    after: tuple[datetime | None, int] | None = None,
+    include_total: bool = True,
+    fields: tuple[str, ...] | None = None,
+    include_weather: bool = True,
+) -> tuple[list[dict], int | None, str | None]:
     """
-    List zones for user with weather. Returns (items, total).
+    List zones for user with weather, newest first. Returns (items, total, next_cursor).
+
+    Offset mode by default; pass after=decode_cursor(...) for keyset mode (offset is
+    then ignored). total is None when include_total is False. next_cursor is None on
+    the last page. Zone rows come from the per-user list cache when possible; weather
+    is always resolved fresh from the weather cache.
+
+    fields (names from ZONE_FIELDS) limits each item, and the columns read, to those
+    fields. With include_weather False no weather is looked up at all.
     """
     limit = max(MIN_LIMIT, min(limit, MAX_LIMIT))
     offset = max(0, offset)
+    if after is not None:
+        offset = 0
 
-    q = (
-        db.session.query(WeatherZone)
-        .filter(WeatherZone.user_id == user_id)
-        .order_by(WeatherZone.updated_at.desc())
+    # updated_at and id make the next cursor
+    read_fields = _read_fields(fields, include_weather, "updated_at")
+    cursor = encode_cursor(*after) if after else ""
+    page_key = f"{limit}:{offset}:{cursor}:{include_total:d}:{include_weather:d}:" + (
+        ",".join(read_fields) if read_fields else "*"
+    )
+    version, page = zone_cache.get_page(user_id, page_key)
+    weather_by_zone = None
+    if page is None:
+        page, weather_by_zone = _load_page(
+            user_id, limit, offset, after, include_total, read_fields, include_weather
+        )
+        zone_cache.set_page(user_id, version, page_key, page)
+    if include_weather:
+        items = _merge_weather(page["items"], weather_by_zone)
+    else:
+        items = [dict(z) for z in page["items"]]
+    if fields is not None:
+        items = _project(items, fields)
+    return items, page["total"], page["next_cursor"]
+
+
+# Read path: plain Core rows of these columns, serialized straight to dicts. No ORM
+# entities are built, so the session's identity map stays empty.
+_ZONE_COLUMNS = (
+    WeatherZone.id,
+    WeatherZone.name,
+    WeatherZone.city_name,
+    WeatherZone.country_code,
+    WeatherZone.latitude,
+    WeatherZone.longitude,
+    WeatherZone.created_at,
+    WeatherZone.updated_at,
+)
+_WEATHER_COLUMNS = (
+    WeatherCache.id.label("weather_id"),
+    WeatherCache.temperature_c,
+    WeatherCache.humidity,
+    WeatherCache.conditions,
+    WeatherCache.wind_speed_kmh,
+    WeatherCache.cached_at,
+)
+
+
+def _zone_columns(fields: tuple[str, ...] | None) -> tuple:
+    if fields is None:
+        return _ZONE_COLUMNS
+    return tuple(getattr(WeatherZone, name) for name in fields if name != "user_id")
+
+
+def _select_zones(fields: tuple[str, ...] | None, with_weather: bool):
+    """SELECT the columns of fields (None: all), joined with cached weather or not."""
+    if with_weather:
+        return _select_with_cached_weather(_zone_columns(fields))
+    return select(*_zone_columns(fields)).select_from(WeatherZone)
+
+
+def _select_with_cached_weather(zone_columns: tuple = _ZONE_COLUMNS):
+    """SELECT zone columns plus the unexpired cached weather of each zone's location."""
+    return (
+        select(*zone_columns, *_WEATHER_COLUMNS)
+        .select_from(WeatherZone)
+        .outerjoin(
+            WeatherCache,
+            and_(
+                WeatherCache.location_id == WeatherZone.location_id,
+                WeatherCache.expires_at > datetime.utcnow(),
+            ),
+        )
     )
-    total = q.count()
-    zones = q.offset(offset).limit(limit).all()
-    return ([_attach_weather(z) for z in zones], total)
 
 
-def get_by_id_for_user(zone_id: int, user_id: int) -> dict | None:
+def _zone_row_dict(row, user_id: int, fields: tuple[str, ...] | None = None) -> dict:
+    """WeatherZone.to_dict() shape (without weather) from a _ZONE_COLUMNS row."""
+    if fields is not None:
+        return {
+            name: user_id if name == "user_id" else getattr(row, name)
+            for name in fields
+        }
+    return {
+        "id": row.id,
+        "user_id": user_id,
+        "name": row.name,
+        "city_name": row.city_name,
+        "country_code": row.country_code,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+def _weather_row_dict(row) -> dict | None:
+    """Same shape as WeatherCache.to_dict(), or None when the join found no weather."""
+    if row.weather_id is None:
+        return None
+    return {
+        "temperature_c": row.temperature_c,
+        "humidity": row.humidity,
+        "conditions": row.conditions,
+        "wind_speed_kmh": row.wind_speed_kmh,
+        "cached_at": row.cached_at,
+    }
+
+
+def _page_query(
+    user_id: int,
+    after: tuple[datetime | None, int] | None,
+    fields: tuple[str, ...] | None,
+    with_weather: bool,
+):
+    """The list SELECT in _LIST_ORDER, seeking past the after position if given."""
+    stmt = _select_zones(fields, with_weather).where(WeatherZone.user_id == user_id)
+    if after is not None:
+        after_updated_at, after_id = after
+        if after_updated_at is None:
+            # Rest of the null block, then every dated row
+            seek = or_(
+                WeatherZone.updated_at.is_not(None),
+                and_(WeatherZone.updated_at.is_(None), WeatherZone.id < after_id),
+            )
+        else:
+            # Null rows sorted first, so they are already behind this cursor
+            seek = or_(
+                WeatherZone.updated_at < after_updated_at,
+                and_(
+                    WeatherZone.updated_at == after_updated_at,
+                    WeatherZone.id < after_id,
+                ),
+            )
+        stmt = stmt.where(seek)
+    return stmt.order_by(*_LIST_ORDER)
+
+
+def _load_page(
+    user_id: int,
+    limit: int,
+    offset: int,
+    after: tuple[datetime | None, int] | None,
+    include_total: bool,
+    fields: tuple[str, ...] | None = None,
+    with_weather: bool = True,
+) -> tuple[dict, dict[int, dict]]:
+    """
+    Read one page of zones joined with their cached weather in one query. Returns the
+    page (zone rows without weather, for the list cache) and {zone_id: weather}.
+    fields limits the zone columns read; without with_weather there is no join.
+    """
+    total = None
+    if include_total:
+        total = db.session.execute(
+            select(func.count())
+            .select_from(WeatherZone)
+            .where(WeatherZone.user_id == user_id)
+        ).scalar_one()
+    stmt = _page_query(user_id, after, fields, with_weather)
+    # One extra row tells us whether another page exists without a COUNT
+    rows = db.session.execute(stmt.offset(offset).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id)
+    items = []
+    weather_by_zone = {}
+    for row in rows:
+        items.append(_zone_row_dict(row, user_id, fields))
+        if with_weather:
+            weather = _weather_row_dict(row)
+            if weather is not None:
+                weather_by_zone[row.id] = weather
+    return {"items": items, "total": total, "next_cursor": next_cursor}, weather_by_zone
+
+
+def get_by_id_for_user(
+    zone_id: int,
+    user_id: int,
+    fields: tuple[str, ...] | None = None,
+    include_weather: bool = True,
+) -> dict | None:
     """
     Get zone by id if it belongs to user. Returns zone dict with weather or None (404).
+    fields and include_weather as for list_for_user.
     """
-    zone = (
-        db.session.query(WeatherZone)
-        .filter(WeatherZone.id == zone_id, WeatherZone.user_id == user_id)
-        .first()
-    )
-    if not zone:
+    read_fields = _read_fields(fields, include_weather)
+    row = db.session.execute(
+        _select_zones(read_fields, include_weather).where(
+            WeatherZone.id == zone_id, WeatherZone.user_id == user_id
+        )
+    ).first()
+    if row is None:
         return None
-    return _attach_weather(zone)
+    zone = _zone_row_dict(row, user_id, read_fields)
+    if include_weather:
+        weather = _weather_row_dict(row)
+        if weather is None:
+            zone = _merge_weather([zone])[0]
+        else:
+            zone["weather"] = weather
+    if fields is not None:
+        zone = _project([zone], fields)[0]
+    return zone
+
+
+def _warm_weather(coords: list[tuple[float, float]]) -> None:
+    """Background task: fetch weather into the cache so the next read is warm."""
+    get_current_weather_many(coords, priority=quota.PREFETCH)
 
 
 def create(
@@ -60,10 +410,14 @@ def create(
     country_code: str,
     latitude: float | None = None,
     longitude: float | None = None,
+    defer_weather: bool = False,
 ) -> tuple[dict | None, str | None]:
     """
     Create zone for user. Enforces unique (user_id, city_name, country_code).
     Returns (zone_dict, error_message). error_message set on duplicate or DB error.
+
+    With defer_weather the zone is returned right after the insert with weather None
+    and weather_status "pending"; the weather fetch runs in the background.
     """
     name = (name or "").strip()
     city_name = (city_name or "").strip()
@@ -71,18 +425,9 @@ def create(
     if not name or not city_name or not country_code:
         return None, "name, city_name and country_code are required"
 
-    existing = (
-        db.session.query(WeatherZone)
-        .filter(
-            WeatherZone.user_id == user_id,
-            WeatherZone.city_name == city_name,
-            WeatherZone.country_code == country_code,
-        )
-        .first()
-    )
-    if existing:
-        return None, "A zone with this city and country already exists"
-
+    location_id = None
+    if latitude is not None and longitude is not None:
+        location_id = ensure_locations([(latitude, longitude)])[(latitude, longitude)]
     try:
         zone = WeatherZone(
             user_id=user_id,
@@ -91,15 +436,29 @@ def create(
             country_code=country_code,
             latitude=latitude,
             longitude=longitude,
+            location_id=location_id,
         )
         db.session.add(zone)
+        # uq_user_city_country is the duplicate check; no SELECT beforehand
         db.session.commit()
-        db.session.refresh(zone)
-        return _attach_weather(zone), None
+    except IntegrityError as e:
+        db.session.rollback()
+        if not _is_duplicate_zone(e):
+            raise
+        return None, "A zone with this city and country already exists"
     except Exception as e:
         db.session.rollback()
         current_app.logger.exception("Zone create failed")
         return None, str(e)
+    zone_cache.invalidate(user_id)
+    db.session.refresh(zone)
+    if not defer_weather:
+        return _attach_weather(zone), None
+    d = zone.to_dict()
+    if zone.latitude is not None and zone.longitude is not None:
+        background.submit(_warm_weather, [(zone.latitude, zone.longitude)])
+        d.update(weather=None, weather_status="pending")
+    return d, None
 
 
 def update(zone_id: int, user_id: int, name: str | None) -> dict | None:
@@ -116,6 +475,7 @@ def update(zone_id: int, user_id: int, name: str | None) -> dict | None:
     if name is not None:
         zone.name = (name or "").strip() or zone.name
     db.session.commit()
+    zone_cache.invalidate(user_id)
     db.session.refresh(zone)
     return _attach_weather(zone)
 
@@ -131,13 +491,14 @@ def delete(zone_id: int, user_id: int) -> bool:
         return False
     db.session.delete(zone)
     db.session.commit()
+    zone_cache.invalidate(user_id)
     return True
 
 
 def refresh_weather(zone_id: int, user_id: int) -> dict | None:
     """
-    Get zone by id for user and force-refresh weather (by calling get_current_weather
-    which may bypass or refresh cache). Returns zone dict with weather or None (404).
+    Get zone by id for user with weather fetched from the API, bypassing the cache
+    (falls back to cached weather on API error). Returns zone dict or None (404).
     """
     zone = (
         db.session.query(WeatherZone)
@@ -146,6 +507,305 @@ def refresh_weather(zone_id: int, user_id: int) -> dict | None:
     )
     if not zone:
         return None
-    # Optional: invalidate cache for this lat/lon so next get_current_weather fetches fresh.
-    # For MVP we just return zone with current cached/fresh weather.
-    return _attach_weather(zone)
+    weather = None
+    if zone.latitude is not None and zone.longitude is not None:
+        weather = get_current_weather(zone.latitude, zone.longitude, force_refresh=True)
+    return zone.to_dict(weather=weather)
+
+
+def _start_refresh_cooldown(user_id: int, cooldown: int) -> int:
+    """
+    Start the user's refresh cooldown unless one is running; returns 0 if started,
+    else the seconds left on it. Kept in the users row, so it holds across workers
+    with or without Redis: one conditional UPDATE decides, whichever worker runs it.
+    """
+    users = User.__table__
+    now = datetime.utcnow()
+    started = db.session.execute(
+        users.update()
+        .where(
+            users.c.id == user_id,
+            or_(
+                users.c.zones_refresh_until.is_(None),
+                users.c.zones_refresh_until <= now,
+            ),
+        )
+        .values(zones_refresh_until=now + timedelta(seconds=cooldown))
+    ).rowcount
+    db.session.commit()
+    if started:
+        return 0
+    ends_at = db.session.execute(
+        select(users.c.zones_refresh_until).where(users.c.id == user_id)
+    ).scalar()
+    if ends_at is None:
+        return cooldown
+    return max(1, math.ceil((ends_at - now).total_seconds()))
+
+
+def refresh_weather_all(
+    user_id: int, zone_ids: list[int] | None = None
+) -> tuple[dict | None, int]:
+    """
+    Force-refresh weather for all of the user's zones (or only zone_ids), at most once
+    per ZONES_REFRESH_COOLDOWN_SECONDS. Upstream calls run concurrently and stop at the
+    refresh deadline; zones that missed it keep their last cached weather.
+
+    Returns (result, retry_after). result is None while the cooldown is active, with
+    retry_after the seconds left on the cooldown. Each zone gets weather_status
+    "refreshed" | "stale" | "unavailable" (zones without coordinates get none).
+    """
+    cooldown = current_app.config.get("ZONES_REFRESH_COOLDOWN_SECONDS") or 0
+    if cooldown:
+        retry_after = _start_refresh_cooldown(user_id, cooldown)
+        if retry_after:
+            return None, retry_after
+
+    q = db.session.query(WeatherZone).filter(WeatherZone.user_id == user_id)
+    if zone_ids is not None:
+        q = q.filter(WeatherZone.id.in_(list(dict.fromkeys(zone_ids))[:BULK_MAX_ITEMS]))
+    zones = q.order_by(WeatherZone.updated_at.desc(), WeatherZone.id.desc()).all()
+    coords = [
+        (z.latitude, z.longitude)
+        for z in zones
+        if z.latitude is not None and z.longitude is not None
+    ]
+    statuses = refresh_weather_many(coords) if coords else {}
+    counts = {"refreshed": 0, "stale": 0, "unavailable": 0}
+    items = []
+    for zone in zones:
+        entry = statuses.get((zone.latitude, zone.longitude))
+        if entry is None:
+            items.append(zone.to_dict())
+            continue
+        status, weather = entry
+        counts[status] += 1
+        d = zone.to_dict()
+        d.update(weather=weather, weather_status=status)
+        items.append(d)
+    return {
+        "items": items,
+        **counts,
+        "partial": counts["stale"] + counts["unavailable"] > 0,
+    }, 0
+
+
+def _clean_bulk_item(raw) -> tuple[dict | None, str | None]:
+    """Normalize one bulk-create item. Returns (fields, error_message)."""
+    if not isinstance(raw, dict):
+        return None, "Each item must be an object"
+    fields = {}
+    for key, max_len in (("name", 120), ("city_name", 120), ("country_code", 10)):
+        value = raw.get(key)
+        value = value.strip() if isinstance(value, str) else ""
+        if not value:
+            return None, "name, city_name and country_code are required"
+        if len(value) > max_len:
+            return None, f"{key} must be at most {max_len} characters"
+        fields[key] = value
+    for key in ("latitude", "longitude"):
+        value = raw.get(key)
+        if value in (None, ""):
+            fields[key] = None
+            continue
+        try:
+            fields[key] = float(value)
+        except (TypeError, ValueError):
+            return None, f"{key} must be a number"
+    return fields, None
+
+
+def bulk_create(user_id: int, items: list) -> list[dict]:
+    """
+    Create many zones for user in one transaction. Duplicates (already stored or
+    repeated in the batch) and invalid items are reported, not raised.
+
+    Returns one result per input item, in order:
+    {"index", "status", "zone"?, "message"?} where status is "created", "duplicate",
+    "invalid" or "error".
+    Zones are returned without weather; it is resolved on the next read.
+    """
+    results: list[dict] = [{"index": i} for i in range(len(items))]
+    pending: list[tuple[int, dict]] = []
+    for i, raw in enumerate(items):
+        fields, err = _clean_bulk_item(raw)
+        if err:
+            results[i].update(status="invalid", message=err)
+        else:
+            pending.append((i, fields))
+
+    # One set-based duplicate check instead of a SELECT per item; the IN compares
+    # under the column collation, _duplicate_key mirrors it for the batch itself
+    cities = sorted({f["city_name"] for _, f in pending})
+    taken: set[tuple[str, str]] = set()
+    for start in range(0, len(cities), _IN_CHUNK):
+        rows = (
+            db.session.query(WeatherZone.city_name, WeatherZone.country_code)
+            .filter(
+                WeatherZone.user_id == user_id,
+                WeatherZone.city_name.in_(cities[start : start + _IN_CHUNK]),
+            )
+            .all()
+        )
+        taken.update(_duplicate_key(city, country) for city, country in rows)
+
+    to_insert: list[tuple[int, WeatherZone]] = []
+    location_ids = ensure_locations(
+        [
+            (f["latitude"], f["longitude"])
+            for _, f in pending
+            if f["latitude"] is not None and f["longitude"] is not None
+        ]
+    )
+    for i, fields in pending:
+        key = _duplicate_key(fields["city_name"], fields["country_code"])
+        if key in taken:
+            results[i].update(
+                status="duplicate",
+                message="A zone with this city and country already exists",
+            )
+            continue
+        taken.add(key)
+        location_id = location_ids.get((fields["latitude"], fields["longitude"]))
+        to_insert.append(
+            (i, WeatherZone(user_id=user_id, location_id=location_id, **fields))
+        )
+
+    if not to_insert:
+        return results
+    try:
+        db.session.add_all([zone for _, zone in to_insert])
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request inserted one of these cities; nothing was written
+        db.session.rollback()
+        for i, _ in to_insert:
+            results[i].update(
+                status="error", message="Conflicting concurrent write; retry the batch"
+            )
+        return results
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Zone bulk create failed")
+        for i, _ in to_insert:
+            results[i].update(status="error", message=str(e))
+        return results
+    zone_cache.invalidate(user_id)
+    # One coordinate pair per distinct location
+    coords: dict[int, tuple[float, float]] = {}
+    for i, zone in to_insert:
+        results[i].update(status="created", zone=zone.to_dict())
+        if zone.location_id is not None:
+            coords.setdefault(zone.location_id, (zone.latitude, zone.longitude))
+    if coords:
+        # One background task warms the weather cache for the whole batch
+        background.submit(_warm_weather, sorted(coords.values()))
+    return results
+
+
+def bulk_delete(user_id: int, zone_ids: list[int]) -> list[dict]:
+    """
+    Delete the user's zones with the given ids in one transaction.
+    Returns [{"id", "status": "deleted" | "not_found"}] in input order.
+    """
+    wanted = list(dict.fromkeys(zone_ids))
+    owned: set[int] = set()
+    for start in range(0, len(wanted), _IN_CHUNK):
+        chunk = wanted[start : start + _IN_CHUNK]
+        rows = (
+            db.session.query(WeatherZone.id)
+            .filter(WeatherZone.user_id == user_id, WeatherZone.id.in_(chunk))
+            .all()
+        )
+        owned.update(zone_id for (zone_id,) in rows)
+    if owned:
+        ids = sorted(owned)
+        for start in range(0, len(ids), _IN_CHUNK):
+            db.session.query(WeatherZone).filter(
+                WeatherZone.user_id == user_id,
+                WeatherZone.id.in_(ids[start : start + _IN_CHUNK]),
+            ).delete(synchronize_session=False)
+        db.session.commit()
+        zone_cache.invalidate(user_id)
+    return [
+        {"id": zone_id, "status": "deleted" if zone_id in owned else "not_found"}
+        for zone_id in wanted
+    ]
+
+
+def _export_rows(user_id: int) -> Iterator[list[dict]]:
+    """Yield the user's zones as plain dicts with cached weather, chunk by chunk."""
+    # Cache only (joined): an export must not fan out to the weather API
+    stmt = (
+        _select_with_cached_weather()
+        .where(WeatherZone.user_id == user_id)
+        .order_by(WeatherZone.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    # yield_per streams from a server-side cursor
+    for partition in db.session.execute(stmt).partitions():
+        chunk = []
+        for row in partition:
+            d = _zone_row_dict(row, user_id)
+            weather = _weather_row_dict(row)
+            if weather is not None:
+                d["weather"] = weather
+            chunk.append(d)
+        yield chunk
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def export_for_user(user_id: int, fmt: str = "ndjson") -> Iterator[str]:
+    """
+    Stream all of the user's zones with cached weather as NDJSON lines or CSV text.
+    Memory stays flat: rows are read, resolved and written EXPORT_CHUNK_SIZE at a time.
+    """
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.DictWriter(
+            buf, fieldnames=EXPORT_CSV_COLUMNS, extrasaction="ignore"
+        )
+        writer.writeheader()
+        yield buf.getvalue()
+        for chunk in _export_rows(user_id):
+            buf.seek(0)
+            buf.truncate()
+            for d in chunk:
+                weather = d.pop("weather", None) or {}
+                d.update(
+                    created_at=_isoformat(d["created_at"]),
+                    updated_at=_isoformat(d["updated_at"]),
+                    temperature_c=weather.get("temperature_c"),
+                    humidity=weather.get("humidity"),
+                    conditions=weather.get("conditions"),
+                    wind_speed_kmh=weather.get("wind_speed_kmh"),
+                    weather_cached_at=_isoformat(weather.get("cached_at")),
+                )
+                writer.writerow(d)
+            yield buf.getvalue()
+        return
+    for chunk in _export_rows(user_id):
+        yield "".join(
+            json.dumps(d, default=json_provider.default) + "\n" for d in chunk
+        )
+
+
+def weather_topics_for_user(user_id: int) -> dict[str, list[int]]:
+    """Map weather pub/sub topic -> ids of the user's zones at that location."""
+    rows = (
+        db.session.query(WeatherZone.id, WeatherZone.latitude, WeatherZone.longitude)
+        .filter(
+            WeatherZone.user_id == user_id,
+            WeatherZone.latitude.isnot(None),
+            WeatherZone.longitude.isnot(None),
+        )
+        .all()
+    )
+    topics: dict[str, list[int]] = {}
+    for zone_id, lat, lon in rows:
+        key = WeatherCache.make_key(lat=lat, lon=lon)
+        topics.setdefault(weather_topic(key), []).append(zone_id)
+    return topics
@@ -1,5 +1,9 @@
 """Debug script to see what routes are registered."""
-from app import create_app
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app  # noqa: E402
 
 cnx = create_app()
 flask_app = cnx.app
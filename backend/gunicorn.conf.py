@@ -1,23 +1,38 @@
 """Gunicorn configuration for production deployment."""
 
+import gc
 import multiprocessing
 import os
 
+from dotenv import load_dotenv
+
+# Before the app (and config) is imported, in the master with preload_app
+load_dotenv()
+
 # Server socket
 bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
 backlog = 2048
 
 # Worker processes
 workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
-worker_class = "sync"
+# gthread: long-lived responses (SSE at /api/zones/events) hold a thread, not a whole
+# worker. Keep SSE_MAX_CONNECTIONS below threads so regular requests still get served.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 50
+# Build the app once in the master: workers (and their recycles after max_requests)
+# fork with Connexion, the parsed spec and the models already loaded, sharing those
+# pages copy-on-write. post_fork below drops the per-process state.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
 timeout = 30
 keepalive = 2
 
 # Logging
-accesslog = "-"
+# ACCESS_LOG=merged|off drops this line per request (app.requests already logs one)
+access_log_mode = os.environ.get("ACCESS_LOG", "gunicorn").lower()
+accesslog = "-" if access_log_mode == "gunicorn" else None
 errorlog = "-"
 loglevel = os.environ.get("LOG_LEVEL", "info").lower()
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
@@ -37,3 +52,24 @@ tmp_upload_dir = None
 keyfile = None
 certfile = None
 
+
+# Hooks
+def when_ready(server):
+    if server.cfg.preload_app:
+        # Move the preloaded objects out of the GC's reach: collections in workers
+        # would otherwise write to (and so copy) the pages holding them
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app import reset_after_fork
+
+        reset_after_fork(worker.app.wsgi().app)
+
+
+def post_worker_init(worker):
+    # Open the DB pool before the worker accepts requests (DB_POOL_WARM connections)
+    from app.db_pool import warm_pool
+
+    warm_pool(worker.app.wsgi().app)
@@ -1,7 +1,11 @@
 """Start the server (Flask dev server; Connexion's .run() would use uvicorn)."""
 
-from app import create_app
-from config import PORT
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app  # noqa: E402
+from config import PORT  # noqa: E402
 
 cnx = create_app()
 flask_app = cnx.app
@@ -0,0 +1,108 @@
+"""Benchmark response serialization: Flask's default JSON provider vs JSONProvider.
+
+Usage (from backend/):
+    python scripts/bench_json.py [--zones 100] [--requests 2000]
+
+Serializes payloads shaped like the hot responses (a zone list page with cached
+weather, a city search) the way Connexion does: app.json.dumps(data, indent=2).
+The default provider is timed with the json_encoder Connexion sets, as before.
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app.json_provider import JSONProvider  # noqa: E402
+
+
+def zone_page(zones):
+    now = datetime.utcnow()
+    return {
+        "zones": [
+            {
+                "id": i,
+                "user_id": 1,
+                "name": f"Zone {i}",
+                "city_name": f"City {i}",
+                "country_code": "GB",
+                "latitude": 40 + i / 100,
+                "longitude": 10 + i / 100,
+                "created_at": now,
+                "updated_at": now,
+                "weather": {
+                    "id": i,
+                    "location_key": f"latlon:{40 + i / 100:.4f},{10 + i / 100:.4f}",
+                    "temperature_c": 20.5,
+                    "humidity": 40,
+                    "conditions": "clear sky",
+                    "wind_speed_kmh": 12.0,
+                    "cached_at": now,
+                },
+            }
+            for i in range(zones)
+        ],
+        "limit": zones,
+        "offset": 0,
+        "next_cursor": None,
+    }
+
+
+def search_results():
+    return {
+        "results": [
+            {
+                "name": f"Springfield {i}",
+                "country": "US",
+                "state": "Illinois",
+                "lat": 39.7817 + i,
+                "lon": -89.6501 - i,
+            }
+            for i in range(5)
+        ]
+    }
+
+
+def bench(provider, payload, n):
+    provider.dumps(payload, indent=2)
+    start = time.perf_counter()
+    for _ in range(n):
+        provider.dumps(payload, indent=2)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zones", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    flask_app = Flask(__name__)
+    # What Connexion 2 installs; the default provider then warns on every call
+    from connexion.apps.flask_app import FlaskJSONEncoder
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    flask_app.json_encoder = FlaskJSONEncoder
+    stock, fast = DefaultJSONProvider(flask_app), JSONProvider(flask_app)
+
+    for label, payload in [
+        (f"zone list ({args.zones})", zone_page(args.zones)),
+        ("city search", search_results()),
+    ]:
+        before = bench(stock, payload, args.requests)
+        after = bench(fast, payload, args.requests)
+        print(
+            f"{label:<16} default {before:8.1f} us  orjson {after:8.1f} us  "
+            f"{before / after:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark rate-limit storage overhead per request: direct vs hybrid.
+
+Usage (from backend/):
+    python scripts/bench_ratelimit.py [--hits 20000] [--keys 50] [--rtt-ms 0.3]
+    python scripts/bench_ratelimit.py --redis redis://localhost:6379/15
+
+Without --redis, the shared backend is the in-process stand-in with --rtt-ms of
+simulated network latency per round trip. "direct" makes one round trip per hit (what
+redis:// does); "hybrid" counts locally and syncs every --sync seconds.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from limits import parse  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+from limits.strategies import FixedWindowRateLimiter  # noqa: E402
+
+from app.ratelimit import HybridStorage, MemoryRemote  # noqa: E402
+
+
+class SlowRemote(MemoryRemote):
+    """Stand-in backend that pays a simulated round trip per call."""
+
+    def __init__(self, rtt: float):
+        super().__init__()
+        self.rtt = rtt
+
+    def apply(self, batch):
+        time.sleep(self.rtt)
+        return super().apply(batch)
+
+
+class DirectStorage(HybridStorage):
+    """One backend round trip per hit (the redis:// behaviour) on a stand-in."""
+
+    def incr(self, key, expiry, amount=1):
+        return self.remote.apply([(key, amount, expiry)])[0][0]
+
+
+def run(name, storage, hits, keys, round_trips):
+    limiter = FixedWindowRateLimiter(storage)
+    limit = parse("1000000 per hour")
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(limit, f"ip-{i % keys}")
+    elapsed = time.perf_counter() - start
+    if isinstance(storage, HybridStorage):
+        storage.sync()
+    print(
+        f"{name:<8} {elapsed / hits * 1e6:9.1f} us/hit  "
+        f"{hits / elapsed:10.0f} hits/s  round trips: {round_trips()}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--sync", type=float, default=0.25)
+    parser.add_argument("--rtt-ms", type=float, default=0.3)
+    parser.add_argument("--redis", default="", help="real Redis URL to compare")
+    args = parser.parse_args()
+
+    if args.redis:
+        direct = storage_from_string(args.redis)
+        direct.reset()
+        run("direct", direct, args.hits, args.keys, lambda: args.hits)
+        hybrid = storage_from_string("hybrid+" + args.redis, sync_interval=args.sync)
+        hybrid.reset()
+        run("hybrid", hybrid, args.hits, args.keys, lambda: hybrid.remote.round_trips)
+        return
+
+    rtt = args.rtt_ms / 1000
+    direct = DirectStorage("hybrid+memory://bench-direct", sync_interval=0)
+    direct.remote = SlowRemote(rtt)
+    run("direct", direct, args.hits, args.keys, lambda: direct.remote.round_trips)
+    hybrid = HybridStorage("hybrid+memory://bench-hybrid", sync_interval=args.sync)
+    hybrid.remote = SlowRemote(rtt)
+    run("hybrid", hybrid, args.hits, args.keys, lambda: hybrid.remote.round_trips)
+
+
+if __name__ == "__main__":
+    main()
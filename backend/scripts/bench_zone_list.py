@@ -0,0 +1,130 @@
+"""Benchmark one zone list page read: ORM entities + to_dict vs Core rows.
+
+Usage (from backend/):
+    python scripts/bench_zone_list.py [--zones 100] [--requests 500]
+
+Seeds an in-memory SQLite database with one user's zones (each with cached weather)
+and times the page query plus serialization, as list_for_user does on a list cache
+miss. Allocations are measured with tracemalloc over a single page read: the peak,
+and what is still held (page, session state) when it returns.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+os.environ.setdefault("RATELIMIT_ENABLED", "false")
+
+from sqlalchemy import and_  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.auth.models import User  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.weather.models import Location, WeatherCache  # noqa: E402
+from app.zones import service as zone_service  # noqa: E402
+from app.zones.models import WeatherZone  # noqa: E402
+
+
+def seed(zones):
+    user = User(username="bench", email="bench@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    expires = datetime.utcnow() + timedelta(days=1)
+    for i in range(zones):
+        lat, lon = 40 + i / 100, 10 + i / 100
+        key = WeatherCache.make_key(lat=lat, lon=lon)
+        location = Location(location_key=key, latitude=lat, longitude=lon)
+        db.session.add(location)
+        db.session.flush()
+        db.session.add_all(
+            [
+                WeatherZone(
+                    user_id=user.id,
+                    name=f"Zone {i}",
+                    city_name=f"City {i}",
+                    country_code="GB",
+                    latitude=lat,
+                    longitude=lon,
+                    location_id=location.id,
+                ),
+                WeatherCache(
+                    location_key=key,
+                    location_id=location.id,
+                    temperature_c=20.5,
+                    humidity=40,
+                    conditions="clear sky",
+                    wind_speed_kmh=12.0,
+                    expires_at=expires,
+                ),
+            ]
+        )
+    db.session.commit()
+    return user.id
+
+
+def orm_page(user_id, limit):
+    """The ORM read path: entities in the identity map, then to_dict per row."""
+    rows = (
+        db.session.query(WeatherZone, WeatherCache)
+        .outerjoin(
+            WeatherCache,
+            and_(
+                WeatherCache.location_id == WeatherZone.location_id,
+                WeatherCache.expires_at > datetime.utcnow(),
+            ),
+        )
+        .filter(WeatherZone.user_id == user_id)
+        .order_by(WeatherZone.updated_at.desc(), WeatherZone.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    return [zone.to_dict(weather=w.to_dict() if w else None) for zone, w in rows]
+
+
+def core_page(user_id, limit):
+    return zone_service._load_page(user_id, limit, 0, None, False)
+
+
+def measure(label, fn, user_id, limit, n):
+    fn(user_id, limit)  # warm up statement caches
+    db.session.remove()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(user_id, limit)
+        db.session.remove()  # a new session per request, as in the app
+    latency = (time.perf_counter() - start) / n * 1e3
+    tracemalloc.start()
+    page = fn(user_id, limit)  # noqa: F841  (kept alive: retained counts the page)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    print(
+        f"{label:<5} {latency:7.2f} ms/page  allocated peak {peak / 1024:7.1f} KiB  "
+        f"retained {retained / 1024:7.1f} KiB"
+    )
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zones", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    app = create_app().app
+    with app.app_context():
+        db.create_all()
+        user_id = seed(args.zones)
+        limit = min(args.zones, zone_service.MAX_LIMIT)
+        before = measure("orm", orm_page, user_id, limit, args.requests)
+        after = measure("core", core_page, user_id, limit, args.requests)
+        print(f"core read path: {before / after:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""Validate api/openapi.yaml and write api/openapi.cache.json for fast app boot.
+
+Usage (from backend/, e.g. at image build):
+    python scripts/build_openapi_cache.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import BASE_DIR  # noqa: E402
+from app.openapi_spec import build_cache  # noqa: E402
+
+if __name__ == "__main__":
+    print(f"wrote {build_cache(BASE_DIR / 'api')}")
@@ -0,0 +1,97 @@
+"""Measure gunicorn boot time and per-worker memory with and without preload_app.
+
+Usage (from backend/, Linux only: reads /proc):
+    python scripts/measure_boot.py [--workers 4] [--port 5099]
+
+Boot time is from spawning gunicorn until every worker is up and /api/health answers.
+RSS counts shared pages in every worker; PSS splits them between the processes that
+share them, so it shows what copy-on-write sharing saves.
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def _memory_kb(pid):
+    """(RSS, PSS) of pid in kB."""
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        fields = dict(line.split()[:2] for line in f if line.split()[0].endswith(":"))
+    return int(fields["Rss:"]), int(fields["Pss:"])
+
+
+def measure(preload, workers, port):
+    env = dict(
+        os.environ,
+        GUNICORN_PRELOAD="true" if preload else "false",
+        GUNICORN_WORKERS=str(workers),
+        PORT=str(port),
+        RATELIMIT_ENABLED="false",
+        LOG_LEVEL="warning",
+    )
+    env.setdefault("DATABASE_URL", "sqlite:////tmp/measure_boot.db")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "app:create_app()",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise SystemExit("gunicorn exited during boot")
+            try:
+                if len(_children(proc.pid)) == workers:
+                    urllib.request.urlopen(
+                        f"http://127.0.0.1:{port}/api/health", timeout=1
+                    )
+                    break
+            except OSError:
+                pass
+            time.sleep(0.02)
+        boot = time.perf_counter() - start
+        time.sleep(1)  # let every worker finish booting, not just the first to answer
+        mem = [_memory_kb(pid) for pid in _children(proc.pid)]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+    rss = sum(m[0] for m in mem) / len(mem) / 1024
+    pss = sum(m[1] for m in mem) / len(mem) / 1024
+    label = "preload" if preload else "no preload"
+    print(
+        f"{label:<11} boot {boot:6.2f}s  "
+        f"per worker: RSS {rss:6.1f} MiB  PSS {pss:6.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+    measure(False, args.workers, args.port)
+    measure(True, args.workers, args.port)
+
+
+if __name__ == "__main__":
+    main()
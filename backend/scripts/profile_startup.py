@@ -0,0 +1,110 @@
+"""Startup profile: per-module import time and cold-start latency of create_app().
+
+Usage (from backend/):
+    python scripts/profile_startup.py [--top 25] [--runs 5]
+
+Imports are measured with ``python -X importtime`` in a fresh interpreter, which is
+what a cold start or a (non-preload) worker recycle pays. Cold start is timed with the
+OpenAPI spec cache (api/openapi.cache.json, built first), without it (libyaml parse)
+and with Connexion loading the YAML itself.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT = "from app import create_app; create_app()"
+TIMED_BOOT = """
+import time
+start = time.perf_counter()
+{setup}
+from app import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+print(imported - start, done - imported)
+"""
+NO_CACHE = "import app.openapi_spec as s; s.CACHE_FILE = 'absent.json'"
+# Connexion loading the YAML itself (pure-Python yaml.safe_load), as before the cache
+CONNEXION_YAML = "import app; app.load_spec = lambda d: str(d / 'openapi.yaml')"
+
+
+def _env():
+    env = dict(os.environ, LOG_LEVEL="ERROR", RATELIMIT_ENABLED="false")
+    env.setdefault("DATABASE_URL", "sqlite://")
+    return env
+
+
+def import_times(top):
+    """Print the slowest imports (cumulative us) and self time per top-level package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        cwd=BACKEND_DIR,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header
+        modules.append((int(cumulative_us), int(self_us), name.strip()))
+    packages = {}
+    for _, self_us, name in modules:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    print(f"slowest imports (cumulative ms), {len(modules)} modules:")
+    for cumulative_us, _, name in sorted(modules, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f}  {name}")
+    print("self time by package (ms):")
+    for root, self_us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {self_us / 1000:8.1f}  {root}")
+
+
+def cold_start(label, setup, runs):
+    imports, factory = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMED_BOOT.format(setup=setup)],
+            cwd=BACKEND_DIR,
+            env=_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        imports.append(float(out[-2]))
+        factory.append(float(out[-1]))
+    imp, fac = statistics.median(imports), statistics.median(factory)
+    print(
+        f"{label:<14} import app {imp * 1000:6.0f} ms  create_app {fac * 1000:6.0f} ms"
+        f"  total {(imp + fac) * 1000:6.0f} ms  (median of {runs})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app import BASE_DIR
+    from app.openapi_spec import build_cache
+
+    build_cache(BASE_DIR / "api")
+    import_times(args.top)
+    cold_start("connexion yaml", CONNEXION_YAML, args.runs)
+    cold_start("no spec cache", NO_CACHE, args.runs)
+    cold_start("spec cache", "", args.runs)
+
+
+if __name__ == "__main__":
+    main()
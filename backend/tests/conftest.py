@@ -1,4 +1,5 @@
 """Pytest fixtures."""
+
 import os
 
 import pytest
@@ -6,12 +7,44 @@ import pytest
 # Use in-memory SQLite for tests so no MSSQL is required
 os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
 os.environ.setdefault("RATELIMIT_ENABLED", "false")
+# Run background tasks inline: the in-memory SQLite connection is not thread-safe
+os.environ.setdefault("BACKGROUND_WORKERS", "0")
+# Hash inline at minimum cost: keeps the suite fast and free of worker processes
+os.environ.setdefault("AUTH_HASH_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# No revocation sync thread (in-memory SQLite); logouts in this process apply at once
+os.environ.setdefault("REVOCATION_SYNC_SECONDS", "0")
 
 from app import create_app
+from app.extensions import db
+
+
+@pytest.fixture
+def app():
+    """Flask app (Connexion app's underlying Flask app) with an empty schema."""
+    flask_app = create_app().app
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    """Flask test client."""
+    return app.test_client()
 
 
 @pytest.fixture
-def client():
-    """Flask test client (Connexion app's underlying Flask app)."""
-    cnx = create_app()
-    return cnx.app.test_client()
+def auth_headers(client):
+    """Authorization header for a freshly registered user."""
+    resp = client.post(
+        "/api/auth/register",
+        json={
+            "username": "tester",
+            "email": "tester@example.com",
+            "password": "secret123",
+        },
+    )
+    assert resp.status_code == 201
+    return {"Authorization": f"Bearer {resp.get_json()['access_token']}"}
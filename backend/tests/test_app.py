@@ -0,0 +1,176 @@
+"""Tests for app factory plumbing."""
+
+import pytest
+
+from app import BASE_DIR, background, reset_after_fork
+from app.cache import get_local_cache
+from app.openapi_spec import CACHE_FILE, SPEC_FILE, api_spec, build_cache, load_spec
+from app.weather import service as weather_service
+
+
+def test_reset_after_fork_drops_inherited_state(app, client):
+    get_local_cache("zones").set("k", 1, 60)
+    background._get_executor(1, 1)
+    weather_service._get_refresh_executor(1)
+
+    reset_after_fork(app)
+
+    assert get_local_cache("zones").get("k") is None
+    assert background._executor is None
+    assert weather_service._refresh_executor is None
+    assert client.get("/api/health").status_code == 200
+
+
+def test_spec_cache_used_only_while_fingerprint_matches(tmp_path):
+    (tmp_path / SPEC_FILE).write_bytes((BASE_DIR / "api" / SPEC_FILE).read_bytes())
+    parsed = load_spec(tmp_path)
+    build_cache(tmp_path)
+    assert load_spec(tmp_path) == parsed
+
+    # Any edit to the YAML invalidates the cache
+    spec_file = tmp_path / SPEC_FILE
+    spec_file.write_text(spec_file.read_text().replace("Weather", "Climate", 1))
+    assert load_spec(tmp_path) != parsed
+
+
+def test_cached_spec_is_not_validated_again(tmp_path):
+    """Connexion's schema validation runs only for a spec that is not from the cache."""
+    import json
+
+    from connexion.exceptions import InvalidSpecification
+    from connexion.spec import Specification
+
+    (tmp_path / SPEC_FILE).write_bytes((BASE_DIR / "api" / SPEC_FILE).read_bytes())
+    cache_file = build_cache(tmp_path)
+    # Tamper with the cached copy: only validation would notice
+    cache = json.loads(cache_file.read_text())
+    cache["spec"]["info"].pop("version")
+    (tmp_path / CACHE_FILE).write_text(json.dumps(cache))
+
+    with api_spec(tmp_path) as spec:
+        Specification.from_dict(spec)
+    with pytest.raises(InvalidSpecification):
+        Specification.from_dict(spec)
+
+    spec_file = tmp_path / SPEC_FILE
+    spec_file.write_text(spec_file.read_text().replace("Weather", "Climate", 1))
+    with api_spec(tmp_path) as spec:
+        assert Specification.from_dict(spec)["info"]["version"]
+
+
+def test_timed_pool_stats_and_warm_up(tmp_path):
+    from flask import Flask
+    from sqlalchemy import exc
+
+    from app.db_pool import TimedQueuePool, init_pool, pool_stats, warm_pool
+    from app.extensions import db
+
+    flask_app = Flask(__name__)
+    # Flask-SQLAlchemy coerces pool_timeout to int (engine_from_config)
+    flask_app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'pool.db'}",
+        SQLALCHEMY_ENGINE_OPTIONS={
+            "pool_size": 2,
+            "max_overflow": 1,
+            "pool_timeout": 1,
+        },
+        DB_POOL_WARM=5,
+    )
+    init_pool(flask_app)
+    db.init_app(flask_app)
+
+    assert warm_pool(flask_app) == 2  # capped at the pool size
+    with flask_app.app_context():
+        pool = db.engine.pool
+        assert isinstance(pool, TimedQueuePool)
+        held = [db.engine.connect() for _ in range(3)]
+        stats = pool_stats(pool)
+        assert stats["checked_out"] == 3 and stats["overflow"] == 1
+        with pytest.raises(exc.TimeoutError):
+            db.engine.connect()
+        for connection in held:
+            connection.close()
+        stats = pool_stats(pool)
+    assert stats["checked_out"] == 0
+    assert stats["checkout_timeouts"] == 1
+    assert stats["checkout_wait_max_ms"] >= 1000
+
+
+def test_json_provider_matches_stdlib_layout(app):
+    import json
+    from datetime import datetime
+
+    from app.json_provider import default
+
+    created = datetime(2024, 1, 2, 3, 4, 5, 678901)
+    payload = {
+        "zones": [
+            {
+                "id": 1,
+                "name": "Home",
+                "latitude": 51.5072,
+                "created_at": created,
+                "weather": {"temperature_c": -3.25, "humidity": 40, "ok": True},
+                "tags": None,
+            }
+        ],
+        "next_cursor": None,
+    }
+    expected = json.dumps(payload, indent=2, sort_keys=True, default=default)
+    assert app.json.dumps(payload, indent=2) == expected
+    assert '"created_at": "2024-01-02T03:04:05.678901"' in expected
+
+    # Non-ASCII keeps the \u escapes of Flask's default provider
+    assert (
+        app.json.dumps({"city": "Zürich"}, indent=2) == '{\n  "city": "Z\\u00fcrich"\n}'
+    )
+
+
+def test_compressed_bodies_cached_by_content_and_encoding(monkeypatch):
+    import gzip
+
+    import brotli
+    from flask import Flask
+    from flask_compress import Compress
+
+    from app.compression import CachingCompress
+
+    flask_app = Flask(__name__)
+    flask_app.config.update(
+        COMPRESS_ALGORITHM=["br", "gzip"],
+        COMPRESS_MIN_SIZE=500,
+        COMPRESS_CACHE_ENTRIES=8,
+        COMPRESS_CACHE_MAX_BYTES=64 * 1024,
+        COMPRESS_CACHE_TTL_SECONDS=60,
+        COMPRESS_CACHE_PATHS=["/big"],
+    )
+    CachingCompress(flask_app)
+    body = {"results": [{"name": f"City {i}", "lat": i} for i in range(50)]}
+    flask_app.add_url_rule("/big", "big", lambda: body)
+    flask_app.add_url_rule("/small", "small", lambda: {"ok": True})
+    flask_app.add_url_rule("/mine", "mine", lambda: body)
+
+    calls = []
+    real = Compress.compress
+    monkeypatch.setattr(
+        Compress, "compress", lambda *a: calls.append(a[-1]) or real(*a)
+    )
+    client = flask_app.test_client()
+    plain = client.get("/big").data
+    for _ in range(3):
+        resp = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        assert resp.headers["Content-Encoding"] == "br"
+        assert brotli.decompress(resp.data) == plain
+    resp = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert gzip.decompress(resp.data) == plain
+    assert calls == ["br", "gzip"]
+
+    # Not an allow-listed path: compressed every time, never cached
+    calls.clear()
+    for _ in range(2):
+        resp = client.get("/mine", headers={"Accept-Encoding": "br"})
+        assert brotli.decompress(resp.data) == plain
+    assert calls == ["br", "br"]
+
+    resp = client.get("/small", headers={"Accept-Encoding": "br"})
+    assert "Content-Encoding" not in resp.headers
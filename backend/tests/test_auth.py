@@ -0,0 +1,126 @@
+"""Tests for /api/auth."""
+
+import pytest
+
+from app.auth.models import User
+from app.extensions import db
+
+
+def _login(client, login="tester", password="secret123"):
+    return client.post("/api/auth/login", json={"login": login, "password": password})
+
+
+def test_login_by_username_or_email(client, auth_headers):
+    assert _login(client).status_code == 200
+    assert _login(client, login="tester@example.com").status_code == 200
+    assert _login(client, password="wrong-pass1").status_code == 401
+
+
+def test_login_rehashes_when_cost_changes(app, client, auth_headers):
+    """Changing BCRYPT_ROUNDS upgrades the stored hash on the next good login."""
+    old_hash = User.query.filter_by(username="tester").one().password_hash
+    app.config["BCRYPT_ROUNDS"] = 5
+    assert _login(client).status_code == 200
+    db.session.expire_all()
+    new_hash = User.query.filter_by(username="tester").one().password_hash
+    assert new_hash != old_hash
+    assert new_hash.startswith("$2b$05$")
+    assert _login(client).status_code == 200
+
+
+def test_me_served_from_claims_and_invalidated_on_change(client, auth_headers):
+    resp = client.get("/api/auth/me", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.get_json()["username"] == "tester"
+
+    user = User.query.filter_by(username="tester").one()
+    user.username = "renamed"
+    db.session.commit()
+    # Same (older) token: claims are no longer trusted, profile comes from the DB
+    assert client.get("/api/auth/me", headers=auth_headers).get_json()["username"] == (
+        "renamed"
+    )
+
+
+def test_cached_profile_expires_while_it_is_being_served(
+    app, client, auth_headers, monkeypatch
+):
+    from types import SimpleNamespace
+
+    from sqlalchemy import update
+
+    from app import cache
+    from app.cache import get_shared_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    app.config["PROFILE_CACHE_TTL_SECONDS"] = 10
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+    # Renamed by another worker: this one only sees the shared change marker
+    user_id = User.query.filter_by(username="tester").one().id
+    db.session.execute(
+        update(User.__table__).values(username="renamed").where(User.id == user_id)
+    )
+    db.session.commit()
+    get_shared_cache().set(f"profile:changed:{user_id}", 2e9, 900)
+
+    now[0] += 6
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    assert me["username"] == "tester"  # still within the TTL
+    now[0] += 6
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    assert me["username"] == "renamed"
+
+
+def test_logout_revokes_only_the_presented_token(client, auth_headers):
+    other = {"Authorization": f"Bearer {_login(client).get_json()['access_token']}"}
+    assert client.post("/api/auth/logout", headers=auth_headers).status_code == 200
+
+    resp = client.get("/api/auth/me", headers=auth_headers)
+    assert resp.status_code == 401
+    assert resp.get_json()["code"] == "unauthorized"
+    assert client.get("/api/auth/me", headers=other).status_code == 200
+
+
+def test_hashing_process_pool_holds_slot_until_hash_finishes(app, monkeypatch):
+    """Pool path: the budget wait times out, and a timed-out hash keeps its slot."""
+    from app.auth import hashing
+
+    monkeypatch.setattr(hashing, "_pool", None)
+    monkeypatch.setattr(hashing, "_pool_pid", None)
+    monkeypatch.setattr(hashing, "_slots", None)
+    app.config.update(
+        AUTH_HASH_WORKERS=1, AUTH_MAX_PENDING=1, AUTH_QUEUE_WAIT_SECONDS=0.05
+    )
+    try:
+        hashed = hashing.hash_password("secret123")
+        assert hashing.verify_password("secret123", hashed)
+        assert not hashing.verify_password("wrong-pass1", hashed)
+
+        app.config.update(BCRYPT_ROUNDS=12, AUTH_HASH_TIMEOUT_SECONDS=0.01)
+        with pytest.raises(hashing.AuthBusyError):
+            hashing.hash_password("secret123")
+        # Still hashing in the worker, so the single slot is taken
+        with pytest.raises(hashing.AuthBusyError):
+            hashing.verify_password("secret123", hashed)
+
+        app.config.update(AUTH_QUEUE_WAIT_SECONDS=10, AUTH_HASH_TIMEOUT_SECONDS=10)
+        assert hashing.verify_password("secret123", hashed)
+    finally:
+        hashing._pool.shutdown()
+
+
+def test_profile_timestamps_are_unix_time_on_any_host_timezone(monkeypatch):
+    import time
+
+    from app.auth import profiles
+
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        profile_at = profiles.claims_for({})["profile_at"]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert abs(profile_at - time.time()) < 5
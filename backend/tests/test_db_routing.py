@@ -0,0 +1,154 @@
+"""Tests for read-replica routing (SQLite files standing in for primary and replica)."""
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import create_app, db_routing
+from app.auth.models import User
+from app.cache import get_shared_cache
+from app.extensions import db
+from config import Config
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'primary.db'}"
+    )
+    monkeypatch.setattr(
+        Config, "SQLALCHEMY_BINDS", {"replica0": f"sqlite:///{tmp_path / 'r.db'}"}
+    )
+    monkeypatch.setattr(db_routing, "_unhealthy_until", {})
+    # init_app adds a (table-less) metadata per bind to the shared db object
+    monkeypatch.setattr(db, "metadatas", dict(db.metadatas))
+    flask_app = create_app().app
+    with flask_app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines["replica0"])
+    # No app context kept open: each request below gets its own session
+    return flask_app
+
+
+def _replicate_users(flask_app):
+    """Copy the users table to the replica (replication catching up)."""
+    with flask_app.app_context():
+        rows = db.session.execute(select(User.__table__)).mappings().all()
+        with db.engines["replica0"].begin() as conn:
+            conn.execute(insert(User.__table__), [dict(row) for row in rows])
+
+
+def _usernames():
+    return db.session.execute(select(User.username)).scalars().all()
+
+
+def test_get_reads_replica_until_the_session_writes(replica_app):
+    with replica_app.app_context(), db.engines["replica0"].begin() as conn:
+        conn.execute(
+            insert(User.__table__),
+            {"username": "on-replica", "email": "r@example.com", "password_hash": "x"},
+        )
+    with replica_app.test_request_context("/", method="GET"):
+        assert _usernames() == ["on-replica"]
+        db.session.add(User(username="new", email="n@example.com", password_hash="x"))
+        db.session.flush()
+        assert _usernames() == ["new"]
+        db.session.rollback()
+        db.session.remove()
+    with replica_app.test_request_context("/", method="POST"):
+        assert _usernames() == []
+        db.session.remove()
+
+
+def test_client_reads_its_writes_within_sticky_window(replica_app):
+    client = replica_app.test_client()
+    resp = client.post(
+        "/api/auth/register",
+        json={"username": "user", "email": "u@example.com", "password": "secret123"},
+    )
+    headers = {"Authorization": f"Bearer {resp.get_json()['access_token']}"}
+    _replicate_users(replica_app)
+
+    resp = client.post(
+        "/api/zones?defer_weather=true",
+        json={
+            "name": "Home",
+            "city_name": "Oslo",
+            "country_code": "NO",
+            "latitude": 59.9,
+            "longitude": 10.7,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    zone_id = resp.get_json()["id"]
+    assert db_routing.STICKY_COOKIE in resp.headers["Set-Cookie"]
+    # The cookie carries the window; the per-process cache plays no part
+    with replica_app.app_context():
+        get_shared_cache().clear()
+    assert client.get(f"/api/zones/{zone_id}", headers=headers).status_code == 200
+
+    # Window over: the replica has not caught up with the zone yet
+    client.delete_cookie("localhost", db_routing.STICKY_COOKIE)
+    assert client.get(f"/api/zones/{zone_id}", headers=headers).status_code == 404
+
+
+def test_unreachable_replica_falls_back_to_primary(replica_app, tmp_path):
+    with replica_app.app_context():
+        db.session.add(
+            User(username="primary", email="p@example.com", password_hash="x")
+        )
+        db.session.commit()
+        db.engines["replica0"].dispose()
+    (tmp_path / "r.db").unlink()
+    (tmp_path / "r.db").mkdir()  # SQLite cannot open a directory
+
+    with replica_app.test_request_context("/", method="GET"):
+        assert _usernames() == ["primary"]
+        assert not db_routing.is_healthy("replica0")
+        db.session.remove()
+
+
+def test_reads_skip_the_window_lookup_without_replicas(app, monkeypatch):
+    def lookup():
+        raise AssertionError("read-your-writes window looked up without replicas")
+
+    monkeypatch.setattr(db_routing, "_recently_wrote", lookup)
+    with app.test_request_context("/", method="GET"):
+        assert _usernames() == []
+
+
+def test_weather_upsert_reads_the_primary_row(replica_app, monkeypatch):
+    """GET /api/weather/current refreshes the primary's row, not a replica miss."""
+    from datetime import datetime, timedelta
+
+    from app.weather import service as weather_service
+    from app.weather.models import Location, WeatherCache
+
+    key = WeatherCache.make_key(lat=59.9, lon=10.7)
+    location = {"id": 1, "location_key": key, "latitude": 59.9, "longitude": 10.7}
+    with replica_app.app_context():
+        db.session.execute(insert(Location.__table__), location)
+        db.session.add(
+            WeatherCache(
+                location_key=key,
+                location_id=1,
+                temperature_c=1.0,
+                expires_at=datetime.utcnow() - timedelta(minutes=1),
+            )
+        )
+        db.session.commit()
+        # Replica: the location, but not yet the weather row
+        with db.engines["replica0"].begin() as conn:
+            conn.execute(insert(Location.__table__), location)
+
+    monkeypatch.setattr(
+        weather_service,
+        "current_weather",
+        lambda *args: {"temperature_c": 20.0, "humidity": 50, "conditions": "clear"},
+    )
+    replica_app.config["OPENWEATHERMAP_API_KEY"] = "test-key"
+    resp = replica_app.test_client().get("/api/weather/current?lat=59.9&lon=10.7")
+    assert resp.status_code == 200
+    assert resp.get_json()["temperature_c"] == 20.0
+    with replica_app.app_context():
+        assert db.session.query(WeatherCache).one().temperature_c == 20.0
@@ -7,3 +7,23 @@ def test_health_returns_ok(client):
     assert resp.status_code == 200
     data = resp.get_json()
     assert data == {"status": "ok"}
+
+
+def test_health_db_reports_pool_only_to_authenticated_callers(client, auth_headers):
+    """GET /api/health/db: status for anyone, the pool (SQLite in tests: no QueuePool
+    gauges) only with a JWT."""
+    resp = client.get("/api/health/db")
+    assert resp.status_code == 200
+    assert resp.get_json() == {"status": "ok"}
+
+    resp = client.get("/api/health/db", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.get_json()["pool"]["pool"]
+
+
+def test_health_db_degraded_while_a_replica_is_unhealthy(client, monkeypatch):
+    from app.controllers import health
+
+    monkeypatch.setattr(health, "replica_keys", lambda engines: ["replica0"])
+    monkeypatch.setattr(health, "is_healthy", lambda key: False)
+    assert client.get("/api/health/db").get_json() == {"status": "degraded"}
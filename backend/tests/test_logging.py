@@ -0,0 +1,70 @@
+"""Tests for app.logging_config."""
+
+import json
+import logging
+import queue
+
+from app import logging_config
+from app.logging_config import (
+    JsonFormatter,
+    _DropReportingListener,
+    _DroppingQueueHandler,
+)
+
+
+def _record(**extra):
+    record = logging.LogRecord(
+        "app.test", logging.INFO, __file__, 1, "hi %s", ("x",), None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_keeps_only_extras():
+    line = JsonFormatter().format(_record(request_id="abc", skipped=None))
+    payload = json.loads(line)
+    assert payload["message"] == "hi x"
+    assert payload["request_id"] == "abc"
+    assert "skipped" not in payload
+    assert "lineno" not in payload and "args" not in payload
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = _DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+    assert handler.dropped == 1
+
+
+def test_listener_reports_drops_periodically_and_at_stop(monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_DROP_REPORT_SECONDS", 0.0)
+    records = queue.Queue(maxsize=1)
+    seen = []
+    sink = logging.Handler()
+    sink.emit = lambda record: seen.append(record.getMessage())
+    handler = _DroppingQueueHandler(records)
+    listener = _DropReportingListener(records, sink, handler)
+
+    for _ in range(3):
+        handler.handle(_record())
+    # Full queue at stop(): the listener drains it before taking the sentinel
+    listener.start()
+    listener.stop()
+    assert "Dropped 2 log records: queue full (LOG_QUEUE_SIZE=10000)" in seen
+    assert seen.count("hi x") == 1
+
+    # Dropped after the last report: logged at shutdown
+    handler.handle(_record())
+    handler.handle(_record())
+    seen.clear()
+    listener.report_dropped()
+    assert seen == ["Dropped 1 log records: queue full (LOG_QUEUE_SIZE=10000)"]
+
+
+def test_request_log_sampling_keeps_errors(client, caplog, monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_REQUEST_SAMPLE_RATE", 0.0)
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        client.get("/api/health")
+        client.get("/api/zones")
+    lines = [r.getMessage() for r in caplog.records if r.name == "app.requests"]
+    assert len(lines) == 1 and " 401 " in lines[0]
@@ -0,0 +1,60 @@
+"""Tests for the hybrid rate-limit storage (hybrid+memory:// stand-in for Redis)."""
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+import app.ratelimit  # noqa: F401  (registers the hybrid+ schemes)
+from app import create_app
+from config import Config
+
+
+def _worker(name):
+    storage = storage_from_string(f"hybrid+memory://{name}", sync_interval=0)
+    return storage, FixedWindowRateLimiter(storage)
+
+
+def test_hits_are_local_until_synced_in_one_batch():
+    storage, limiter = _worker("local")
+    limit = parse("5 per minute")
+    assert all(limiter.hit(limit, "ip-a") for _ in range(5))
+    assert not limiter.hit(limit, "ip-a")
+    assert limiter.hit(limit, "ip-b")
+    assert storage.remote.round_trips == 0
+
+    storage.sync()
+    assert storage.remote.round_trips == 1
+    assert storage.get(limit.key_for("ip-a")) == 6
+
+
+def test_incr_accepts_other_limits_versions_keywords():
+    """limits < 4 passes elastic_expiry; unknown keywords must not break requests."""
+    storage, _ = _worker("keywords")
+    assert storage.incr("k", 60, elastic_expiry=False, amount=2) == 2
+    assert storage.incr("k", 60, amount=1, future_option=True) == 3
+
+
+def test_workers_converge_with_bounded_overshoot():
+    (s1, w1), (s2, w2) = _worker("shared"), _worker("shared")
+    limit = parse("10 per minute")
+    admitted = sum(w1.hit(limit, "ip") for _ in range(6))
+    admitted += sum(w2.hit(limit, "ip") for _ in range(6))
+    # Neither worker has seen the other's hits yet: overshoot of one interval
+    assert admitted == 12
+
+    s1.sync()
+    s2.sync()
+    s1.sync()
+    assert s1.get(limit.key_for("ip")) == s2.get(limit.key_for("ip")) == 12
+    assert not w1.hit(limit, "ip")
+    assert not w2.hit(limit, "ip")
+
+
+def test_limiter_uses_hybrid_storage(monkeypatch):
+    monkeypatch.setattr(Config, "RATELIMIT_ENABLED", True)
+    monkeypatch.setattr(Config, "RATELIMIT_DEFAULT", "2 per minute")
+    monkeypatch.setattr(Config, "RATELIMIT_STORAGE_URL", "hybrid+memory://app")
+    monkeypatch.setattr(Config, "RATELIMIT_SYNC_SECONDS", 0)
+    client = create_app().app.test_client()
+    codes = [client.get("/api/health").status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
@@ -0,0 +1,75 @@
+"""Tests for the compiled Connexion parameter validator."""
+
+import pytest
+from connexion.decorators.validation import ParameterValidator
+from connexion.exceptions import ProblemException
+from connexion.lifecycle import ConnexionRequest
+
+from app import BASE_DIR
+from app.openapi_spec import load_spec
+from app.validation import CompiledParameterValidator
+
+SPEC = load_spec(BASE_DIR / "api")
+
+
+def _outcome(validator_cls, path, query):
+    params = SPEC["paths"][path]["get"]["parameters"]
+    validate = validator_cls(params, api=None, strict_validation=True)(lambda r: "ok")
+    try:
+        return validate(ConnexionRequest("http://test" + path, "GET", query=query))
+    except ProblemException as e:
+        return (type(e).__name__, e.status, e.detail)
+
+
+@pytest.mark.parametrize(
+    "path,query",
+    [
+        ("/api/weather/current", {"lat": "51.5", "lon": "-0.12"}),
+        ("/api/weather/current", {"lat": "north", "lon": "0"}),
+        ("/api/weather/current", {"lat": "1"}),
+        ("/api/weather/current", {"lat": "1", "lon": "2", "units": "metric"}),
+        ("/api/zones", {}),
+        ("/api/zones", {"limit": "100", "offset": "0", "include_total": "false"}),
+        ("/api/zones", {"limit": "0"}),
+        ("/api/zones", {"limit": "101"}),
+        ("/api/zones", {"limit": "2.5"}),
+        ("/api/zones", {"offset": "-1"}),
+        ("/api/zones", {"cursor": "x" * 201}),
+        ("/api/zones", {"include_total": "maybe"}),
+        ("/api/zones", {"fields": "id,name", "include": "weather"}),
+        ("/api/zones", {"fields": "id,password_hash"}),
+        ("/api/zones/export", {"format": "xml"}),
+    ],
+)
+def test_same_outcome_as_connexion(path, query):
+    expected = _outcome(ParameterValidator, path, query)
+    assert _outcome(CompiledParameterValidator, path, query) == expected
+
+
+def test_invalid_param_is_a_validation_error(client, auth_headers):
+    resp = client.get("/api/zones?limit=0", headers=auth_headers)
+    assert resp.status_code == 400
+    assert "less than the minimum of 1" in resp.get_json()["detail"]
+
+
+def test_app_validates_parameters_with_compiled_validator(
+    client, auth_headers, monkeypatch
+):
+    seen = []
+    validate = CompiledParameterValidator.validate_parameter
+
+    def spy(self, parameter_type, value, param, param_name=None):
+        seen.append(param["name"])
+        return validate(self, parameter_type, value, param, param_name)
+
+    monkeypatch.setattr(CompiledParameterValidator, "validate_parameter", spy)
+    resp = client.get("/api/zones?limit=5", headers=auth_headers)
+    assert resp.status_code == 200
+    assert "limit" in seen
+
+    seen.clear()
+    resp = client.get("/api/zones?limit=0", headers=auth_headers)
+    assert resp.status_code == 400 and "limit" in seen
+    # Same body as Connexion's stock validator produces
+    _, status, detail = _outcome(ParameterValidator, "/api/zones", {"limit": "0"})
+    assert (resp.get_json()["status"], resp.get_json()["detail"]) == (status, detail)
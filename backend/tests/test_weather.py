@@ -0,0 +1,205 @@
+"""Tests for /api/weather."""
+
+
+def test_current_batch_reads_cache_once_and_fetches_misses(app, client, monkeypatch):
+    from app.integrations.openweathermap import OpenWeatherMapError
+    from app.weather import service as weather_service
+
+    calls = []
+
+    def fake_current_weather(api_key, lat, lon):
+        calls.append((lat, lon))
+        if lat > 80:
+            raise OpenWeatherMapError("upstream down")
+        return {"temperature_c": 20.0, "humidity": 50, "conditions": "clear"}
+
+    monkeypatch.setattr(weather_service, "current_weather", fake_current_weather)
+    app.config["OPENWEATHERMAP_API_KEY"] = "test-key"
+    assert client.get("/api/weather/current?lat=59.9&lon=10.7").status_code == 200
+    calls.clear()
+
+    body = {
+        "coordinates": [
+            {"lat": 59.9, "lon": 10.7},
+            {"lat": 41.9, "lon": 12.5},
+            {"lat": 89.0, "lon": 0.0},
+            {"lat": 41.9, "lon": 12.5},
+        ]
+    }
+    resp = client.post("/api/weather/current/batch", json=body)
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+    assert [r["status"] for r in results] == [
+        "cached",
+        "refreshed",
+        "unavailable",
+        "refreshed",
+    ]
+    assert results[1]["weather"]["temperature_c"] == 20.0
+    assert results[2]["weather"] is None
+    assert sorted(calls) == [(41.9, 12.5), (89.0, 0.0)]
+
+    too_many = {"coordinates": [{"lat": 0, "lon": 0}] * 101}
+    resp = client.post("/api/weather/current/batch", json=too_many)
+    assert resp.status_code == 400
+
+
+def test_quota_priorities_and_cache_fallback(app, client, monkeypatch):
+    from app.weather import quota
+    from app.weather import service as weather_service
+
+    calls = []
+
+    def fake_current_weather(api_key, lat, lon):
+        calls.append((lat, lon))
+        return {"temperature_c": 20.0, "humidity": 50, "conditions": "clear"}
+
+    monkeypatch.setattr(weather_service, "current_weather", fake_current_weather)
+    app.config.update(OPENWEATHERMAP_API_KEY="test-key", WEATHER_CACHE_TTL_MINUTES=0)
+    app.config["OPENWEATHERMAP_CALLS_PER_MINUTE"] = 10
+    assert client.get("/api/weather/current?lat=59.9&lon=10.7").status_code == 200
+
+    # 9 tokens left: prefetch stops at 5, search at 2, interactive at 0
+    taken = [
+        sum(quota.try_acquire(priority) for _ in range(10))
+        for priority in (quota.PREFETCH, quota.SEARCH, quota.INTERACTIVE)
+    ]
+    assert taken == [4, 3, 2]
+
+    # Over budget: the expired snapshot is served instead of calling upstream
+    resp = client.get("/api/weather/current?lat=59.9&lon=10.7")
+    assert resp.status_code == 200
+    assert resp.get_json()["temperature_c"] == 20.0
+    assert calls == [(59.9, 10.7)]
+
+
+def test_forecast_packed_once_and_sliced(app, client, monkeypatch):
+    import time
+
+    from app.weather import service as weather_service
+    from app.weather.models import pack_forecast, unpack_forecast
+
+    start = int(time.time()) // 10800 * 10800
+    slots = [
+        {
+            "time": start + i * 10800,
+            "temperature_c": 10.25 + i,
+            "humidity": 60 if i else None,
+            "wind_speed_kmh": 3.6,
+        }
+        for i in range(40)
+    ]
+    data = pack_forecast(slots)
+    assert len(data) == 40 * (8 + 4 + 1 + 4)
+    assert unpack_forecast(data, 40, 0, 2)["humidity"] == [None, 60]
+
+    calls = []
+    monkeypatch.setattr(
+        weather_service, "forecast", lambda *args: calls.append(args) or slots
+    )
+    app.config["OPENWEATHERMAP_API_KEY"] = "test-key"
+    for _ in range(2):
+        resp = client.get("/api/weather/forecast?lat=59.9&lon=10.7&hours=24")
+        assert resp.status_code == 200
+    assert len(calls) == 1
+
+    got = resp.get_json()["slots"]
+    assert len(got) == 9  # the slot covering now plus 24 hours of 3-hour slots
+    assert got[1] == {
+        "time": got[1]["time"],
+        "temperature_c": 11.25,
+        "humidity": 60,
+        "wind_speed_kmh": 3.6,
+    }
+    app.config["OPENWEATHERMAP_API_KEY"] = ""
+    assert client.get("/api/weather/forecast?lat=0&lon=0").status_code == 503
+
+
+def test_forecast_insert_race_and_past_only_record(app, client, monkeypatch):
+    """A lost insert race overwrites the winner; an all-past record serves no slots."""
+    import time
+    from datetime import datetime, timedelta
+    from types import SimpleNamespace
+
+    from app.extensions import db
+    from app.integrations.openweathermap import OpenWeatherMapError
+    from app.weather import service as weather_service
+    from app.weather.models import WeatherCache, WeatherForecast
+
+    key = WeatherCache.make_key(lat=59.9, lon=10.7)
+    past = int(time.time()) // 10800 * 10800 - 2 * 86400
+    slots = [{"time": past + i * 10800, "temperature_c": 1.0} for i in range(4)]
+    expired = datetime.utcnow() - timedelta(hours=1)
+    weather_service._store_forecast(key, 59.9, 10.7, slots[:1], expired)
+
+    # Another worker's row appears between our UPDATE and INSERT
+    execute = db.session.execute
+
+    def racing_execute(stmt, *args, **kwargs):
+        if stmt.is_dml and stmt.is_update and not racing_execute.raced:
+            racing_execute.raced = True
+            return SimpleNamespace(rowcount=0)
+        return execute(stmt, *args, **kwargs)
+
+    racing_execute.raced = False
+    monkeypatch.setattr(db.session, "execute", racing_execute)
+    weather_service._store_forecast(key, 59.9, 10.7, slots, expired)
+    monkeypatch.undo()
+    assert racing_execute.raced
+    assert db.session.query(WeatherForecast).one().slots == 4
+
+    # Slots without a time are skipped by the client
+    from app.integrations import openweathermap
+
+    listing = {"list": [{"main": {"temp": 5}}, {"dt": past, "main": {"temp": 6}}]}
+    monkeypatch.setattr(
+        openweathermap,
+        "_get_with_retry",
+        lambda url, params: SimpleNamespace(status_code=200, json=lambda: listing),
+    )
+    assert [s["time"] for s in openweathermap.forecast("k", 0, 0)] == [past]
+    monkeypatch.undo()
+
+    def upstream_down(*args):
+        raise OpenWeatherMapError("upstream down")
+
+    monkeypatch.setattr(weather_service, "forecast", upstream_down)
+    app.config["OPENWEATHERMAP_API_KEY"] = "test-key"
+    resp = client.get("/api/weather/forecast?lat=59.9&lon=10.7")
+    assert resp.status_code == 200
+    assert resp.get_json()["slots"] == []
+
+
+def test_refresh_many_shares_one_bounded_executor(app, monkeypatch):
+    import threading
+
+    from app.weather import service as weather_service
+
+    release = threading.Event()
+    threads = set()
+
+    def slow_current_weather(api_key, lat, lon):
+        threads.add(threading.current_thread().name)
+        release.wait(5)
+        return {"temperature_c": 20.0, "humidity": 50, "conditions": "clear"}
+
+    monkeypatch.setattr(weather_service, "current_weather", slow_current_weather)
+    monkeypatch.setattr(weather_service, "_refresh_executor", None)
+    app.config["OPENWEATHERMAP_API_KEY"] = "test-key"
+    app.config["WEATHER_REFRESH_CONCURRENCY"] = 2
+
+    coords = [(float(i), 0.0) for i in range(5)]
+    first = weather_service.refresh_weather_many(coords, deadline=0.2)
+    assert {status for status, _ in first.values()} == {"unavailable"}
+    pool = weather_service._refresh_executor
+    weather_service.refresh_weather_many(coords, deadline=0.2)
+    # Missed deadlines leave no extra threads behind: same pool, same two workers
+    assert weather_service._refresh_executor is pool
+    assert len(pool._threads) == 2
+
+    release.set()
+    assert weather_service.refresh_weather_many(coords[:1])[(0.0, 0.0)][0] == (
+        "refreshed"
+    )
+    assert len(threads) == 2
+    pool.shutdown()
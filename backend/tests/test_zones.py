@@ -0,0 +1,454 @@
+"""Tests for /api/zones."""
+
+
+def _create_zones(client, headers, n):
+    for i in range(n):
+        resp = client.post(
+            "/api/zones",
+            json={"name": f"Zone {i}", "city_name": f"City {i}", "country_code": "GB"},
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+
+def test_list_offset_mode_keeps_total(client, auth_headers):
+    """Offset pagination still returns total, plus a cursor for the next page."""
+    _create_zones(client, auth_headers, 3)
+    data = client.get("/api/zones?limit=2", headers=auth_headers).get_json()
+    assert data["total"] == 3
+    assert len(data["items"]) == 2
+    assert data["next_cursor"]
+
+
+def test_list_cursor_mode_walks_all_zones(client, auth_headers):
+    """Following next_cursor visits every zone once and skips the count."""
+    _create_zones(client, auth_headers, 5)
+    seen, cursor = [], None
+    while True:
+        url = "/api/zones?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        data = client.get(url, headers=auth_headers).get_json()
+        seen.extend(z["id"] for z in data["items"])
+        if cursor:
+            assert data["total"] is None
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(set(seen))
+    assert len(seen) == 5
+
+
+def test_list_cursor_mode_walks_zones_without_updated_at(app, client, auth_headers):
+    """Rows with a null updated_at list first and their cursors stay valid."""
+    from app.extensions import db
+    from app.zones.models import WeatherZone
+
+    _create_zones(client, auth_headers, 5)
+    ids = sorted(
+        z["id"] for z in client.get("/api/zones", headers=auth_headers).json["items"]
+    )
+    db.session.execute(
+        WeatherZone.__table__.update()
+        .where(WeatherZone.id.in_(ids[1:4]))
+        .values(updated_at=None)
+    )
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/zones?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(url, headers=auth_headers)
+        assert resp.status_code == 200
+        seen.extend(z["id"] for z in resp.get_json()["items"])
+        cursor = resp.get_json()["next_cursor"]
+        if not cursor:
+            break
+    assert seen[:3] == [ids[3], ids[2], ids[1]]
+    assert sorted(seen) == ids
+
+
+def test_list_query_compiles_for_mssql(app):
+    """SQL Server has no NULLS FIRST/LAST; the list order must not need it."""
+    from datetime import datetime
+
+    from sqlalchemy.dialects import mssql
+
+    from app.zones.service import _page_query
+
+    for after in (None, (None, 5), (datetime(2026, 1, 1), 5)):
+        stmt = _page_query(1, after, None, True).offset(10).limit(3)
+        sql = str(stmt.compile(dialect=mssql.dialect()))
+        assert "NULLS" not in sql.upper()
+        assert "ORDER BY CASE" in sql
+
+
+def test_list_invalid_cursor_is_400(client, auth_headers):
+    resp = client.get("/api/zones?cursor=not-a-cursor", headers=auth_headers)
+    assert resp.status_code == 400
+    assert resp.get_json()["code"] == "validation_error"
+
+
+def test_list_cache_invalidated_on_write(app, client, auth_headers):
+    """A cached page is not served after create, update or delete."""
+    app.config["ZONES_CACHE_ENABLED"] = True
+    _create_zones(client, auth_headers, 1)
+    first = client.get("/api/zones", headers=auth_headers).get_json()
+    zone_id = first["items"][0]["id"]
+
+    client.put(f"/api/zones/{zone_id}", json={"name": "Renamed"}, headers=auth_headers)
+    data = client.get("/api/zones", headers=auth_headers).get_json()
+    assert data["items"][0]["name"] == "Renamed"
+
+    client.post(
+        "/api/zones",
+        json={"name": "Other", "city_name": "Paris", "country_code": "FR"},
+        headers=auth_headers,
+    )
+    assert client.get("/api/zones", headers=auth_headers).get_json()["total"] == 2
+
+    client.delete(f"/api/zones/{zone_id}", headers=auth_headers)
+    data = client.get("/api/zones", headers=auth_headers).get_json()
+    assert zone_id not in [z["id"] for z in data["items"]]
+
+
+def test_list_cache_off_without_redis_so_workers_agree(tmp_path, monkeypatch):
+    """Two workers on one DB without REDIS_URL: a write on one shows on the other."""
+    import config
+    from app import create_app
+    from app.extensions import db
+
+    monkeypatch.setattr(
+        config.Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path}/zones.db"
+    )
+    worker_a, worker_b = create_app().app, create_app().app
+    assert not worker_a.config["ZONES_CACHE_ENABLED"]
+    with worker_a.app_context():
+        db.create_all()
+    client_a, client_b = worker_a.test_client(), worker_b.test_client()
+    resp = client_a.post(
+        "/api/auth/register",
+        json={"username": "two", "email": "two@example.com", "password": "secret123"},
+    )
+    headers = {"Authorization": f"Bearer {resp.get_json()['access_token']}"}
+
+    assert client_b.get("/api/zones", headers=headers).get_json()["total"] == 0
+    _create_zones(client_a, headers, 1)
+    assert client_b.get("/api/zones", headers=headers).get_json()["total"] == 1
+
+
+def test_bulk_create_reports_per_item(client, auth_headers):
+    """JSON bulk create inserts new zones and flags duplicates and invalid rows."""
+    _create_zones(client, auth_headers, 1)
+    resp = client.post(
+        "/api/zones/bulk",
+        json=[
+            {"name": "A", "city_name": "City 0", "country_code": "GB"},
+            {"name": "B", "city_name": "Oslo", "country_code": "NO"},
+            {"name": "C", "city_name": "Oslo", "country_code": "NO"},
+            {"name": "D", "city_name": "", "country_code": "NO"},
+        ],
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200
+    statuses = [r["status"] for r in resp.get_json()["results"]]
+    assert statuses == ["duplicate", "created", "duplicate", "invalid"]
+
+
+def test_bulk_and_single_create_agree_on_duplicates(client, auth_headers):
+    """Both paths follow uq_user_city_country (exact on SQLite; MSSQL ignores case)."""
+
+    def create(city):
+        body = {"name": city, "city_name": city, "country_code": "NO"}
+        return client.post("/api/zones", json=body, headers=auth_headers)
+
+    assert create("Oslo").status_code == 201
+    resp = client.post(
+        "/api/zones/bulk",
+        json=[
+            {"name": n, "city_name": n, "country_code": "NO"}
+            for n in ("Oslo", "oslo", "Bergen", "bergen", "Bergen")
+        ],
+        headers=auth_headers,
+    )
+    statuses = [r["status"] for r in resp.get_json()["results"]]
+    assert statuses == ["duplicate", "created", "created", "created", "duplicate"]
+    assert create("Bergen").status_code == 400
+    assert create("BERGEN").status_code == 201
+
+
+def test_bulk_create_csv_and_bulk_delete(client, auth_headers):
+    csv_body = (
+        "name,city_name,country_code,latitude,longitude\nHome,Rome,IT,41.9,12.5\n"
+    )
+    resp = client.post(
+        "/api/zones/bulk",
+        data=csv_body,
+        content_type="text/csv",
+        headers=auth_headers,
+    )
+    result = resp.get_json()["results"][0]
+    assert result["status"] == "created"
+    assert result["zone"]["latitude"] == 41.9
+
+    resp = client.post(
+        "/api/zones/bulk-delete",
+        json={"ids": [result["zone"]["id"], 9999]},
+        headers=auth_headers,
+    )
+    assert resp.get_json()["deleted"] == 1
+    assert [r["status"] for r in resp.get_json()["results"]] == ["deleted", "not_found"]
+
+
+def test_export_streams_ndjson_and_csv(client, auth_headers):
+    _create_zones(client, auth_headers, 3)
+    resp = client.get("/api/zones/export", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    lines = resp.get_data(as_text=True).splitlines()
+    assert len(lines) == 3
+
+    resp = client.get("/api/zones/export?format=csv", headers=auth_headers)
+    rows = resp.get_data(as_text=True).splitlines()
+    assert rows[0].startswith("id,name,city_name")
+    assert len(rows) == 4
+
+
+def test_create_deferred_weather_and_duplicate(client, auth_headers):
+    body = {
+        "name": "Home",
+        "city_name": "Oslo",
+        "country_code": "NO",
+        "latitude": 59.9,
+        "longitude": 10.7,
+    }
+    resp = client.post("/api/zones?defer_weather=true", json=body, headers=auth_headers)
+    assert resp.status_code == 201
+    data = resp.get_json()
+    assert data["weather"] is None
+    assert data["weather_status"] == "pending"
+
+    resp = client.post("/api/zones", json=body, headers=auth_headers)
+    assert resp.status_code == 400
+    assert "already exists" in resp.get_json()["message"]
+
+
+def test_create_reraises_integrity_errors_other_than_duplicates(app):
+    import pytest
+    from sqlalchemy.exc import IntegrityError
+
+    from app.zones import service as zone_service
+
+    # NOT NULL user_id, not uq_user_city_country: not reported as a duplicate
+    with pytest.raises(IntegrityError):
+        zone_service.create(None, "Home", "Oslo", "NO")
+
+
+def test_refresh_all_dedupes_and_applies_cooldown(
+    app, client, auth_headers, monkeypatch
+):
+    """Bulk refresh calls the API once per location and is rate limited per user."""
+    from app.weather import service as weather_service
+
+    calls = []
+
+    def fake_current_weather(api_key, lat, lon):
+        calls.append((lat, lon))
+        return {"temperature_c": 20.0, "humidity": 50, "conditions": "clear"}
+
+    monkeypatch.setattr(weather_service, "current_weather", fake_current_weather)
+    app.config["OPENWEATHERMAP_API_KEY"] = "test-key"
+    client.post(
+        "/api/zones/bulk",
+        json=[
+            {
+                "name": n,
+                "city_name": n,
+                "country_code": "XX",
+                "latitude": lat,
+                "longitude": lon,
+            }
+            for n, lat, lon in (("A", 59.9, 10.7), ("B", 59.9, 10.7), ("C", 41.9, 12.5))
+        ],
+        headers=auth_headers,
+    )
+    calls.clear()
+
+    resp = client.post("/api/zones/refresh", headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["refreshed"] == 3
+    assert data["partial"] is False
+    assert sorted(calls) == [(41.9, 12.5), (59.9, 10.7)]
+
+    resp = client.post("/api/zones/refresh", headers=auth_headers)
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == str(
+        app.config["ZONES_REFRESH_COOLDOWN_SECONDS"]
+    )
+
+    # Retry-After counts down with the cooldown
+    from datetime import datetime, timedelta
+
+    from app.zones import service as zone_service
+
+    later = datetime.utcnow() + timedelta(seconds=44.5)
+
+    class Later(datetime):
+        @classmethod
+        def utcnow(cls):
+            return later
+
+    monkeypatch.setattr(zone_service, "datetime", Later)
+    resp = client.post("/api/zones/refresh", headers=auth_headers)
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "16"
+
+
+def test_refresh_cooldown_holds_across_workers(tmp_path, monkeypatch):
+    """Without REDIS_URL the cooldown still holds on every worker (it is in the DB)."""
+    import config
+    from app import create_app
+    from app.extensions import db
+
+    monkeypatch.setattr(
+        config.Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path}/zones.db"
+    )
+    worker_a, worker_b = create_app().app, create_app().app
+    with worker_a.app_context():
+        db.create_all()
+    client_a, client_b = worker_a.test_client(), worker_b.test_client()
+    resp = client_a.post(
+        "/api/auth/register",
+        json={"username": "two", "email": "two@example.com", "password": "secret123"},
+    )
+    headers = {"Authorization": f"Bearer {resp.get_json()['access_token']}"}
+
+    assert client_a.post("/api/zones/refresh", headers=headers).status_code == 200
+    resp = client_b.post("/api/zones/refresh", headers=headers)
+    assert resp.status_code == 429
+    assert 0 < int(resp.headers["Retry-After"]) <= 60
+
+
+def test_events_stream_pushes_weather_for_my_zones(app, client, auth_headers):
+    from app.weather.models import WeatherCache
+    from app.weather.service import publish_weather_update
+
+    app.config.update(SSE_HEARTBEAT_SECONDS=0.05, SSE_MAX_SECONDS=1)
+    zone = client.post(
+        "/api/zones",
+        json={
+            "name": "Home",
+            "city_name": "Oslo",
+            "country_code": "NO",
+            "latitude": 59.9,
+            "longitude": 10.7,
+        },
+        headers=auth_headers,
+    ).get_json()
+
+    resp = client.get("/api/zones/events", headers=auth_headers, buffered=False)
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    publish_weather_update(
+        WeatherCache.make_key(lat=59.9, lon=10.7), {"temperature_c": 3.0}
+    )
+    body = "".join(
+        chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in resp.response
+    )
+    resp.close()
+    assert "event: weather" in body
+    assert f'"zone_ids": [{zone["id"]}]' in body
+
+
+def test_zones_share_locations_and_read_weather_in_one_join(
+    app, client, auth_headers, monkeypatch
+):
+    """Zones at one point share a location; list/get join its cached weather."""
+    from sqlalchemy import event
+
+    from app.extensions import db
+    from app.weather import service as weather_service
+    from app.weather.models import Location
+
+    monkeypatch.setattr(
+        weather_service,
+        "current_weather",
+        lambda api_key, lat, lon: {"temperature_c": 7.0, "humidity": 70},
+    )
+    app.config["OPENWEATHERMAP_API_KEY"] = "test-key"
+    body = {"name": "Home", "country_code": "NO", "latitude": 59.9, "longitude": 10.7}
+    first = client.post(
+        "/api/zones", json={**body, "city_name": "Oslo"}, headers=auth_headers
+    ).get_json()
+    client.post(
+        "/api/zones", json={**body, "city_name": "Oslo S"}, headers=auth_headers
+    )
+    assert db.session.query(Location).count() == 1
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if "weather_" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        zone = client.get(f"/api/zones/{first['id']}", headers=auth_headers).get_json()
+        items = client.get(
+            "/api/zones?include_total=false", headers=auth_headers
+        ).get_json()["items"]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    assert zone["weather"]["temperature_c"] == 7.0
+    assert [z["weather"]["temperature_c"] for z in items] == [7.0, 7.0]
+    assert len(statements) == 2
+    assert all("JOIN weather_cache" in statement for statement in statements)
+
+
+def test_list_read_path_leaves_session_empty(app, client, auth_headers):
+    """Zone pages are built from Core rows: no entities enter the identity map."""
+    from app.extensions import db
+    from app.zones import service as zone_service
+
+    _create_zones(client, auth_headers, 3)
+    user_id = client.get("/api/auth/me", headers=auth_headers).get_json()["id"]
+    db.session.expunge_all()
+    items, total, _ = zone_service.list_for_user(user_id, limit=2)
+    assert (len(items), total) == (2, 3)
+    assert zone_service.get_by_id_for_user(items[0]["id"], user_id)["id"]
+    assert len(db.session.identity_map) == 0
+
+
+def test_sparse_fields_skip_weather_lookups(client, auth_headers, monkeypatch):
+    from app.zones import service as zone_service
+
+    client.post(
+        "/api/zones?defer_weather=true",
+        json={
+            "name": "Home",
+            "city_name": "Oslo",
+            "country_code": "NO",
+            "latitude": 59.9,
+            "longitude": 10.7,
+        },
+        headers=auth_headers,
+    )
+
+    def no_weather(*args, **kwargs):
+        raise AssertionError("weather looked up")
+
+    monkeypatch.setattr(zone_service, "get_current_weather_many", no_weather)
+    resp = client.get("/api/zones?fields=id,name", headers=auth_headers)
+    assert resp.status_code == 200
+    (item,) = resp.get_json()["items"]
+    assert set(item) == {"id", "name"}
+
+    resp = client.get(f"/api/zones/{item['id']}?fields=name", headers=auth_headers)
+    assert resp.get_json() == {"name": "Home"}
+
+    monkeypatch.setattr(zone_service, "get_current_weather_many", lambda coords: {})
+    resp = client.get(
+        "/api/zones?fields=name&include=weather&include_total=false",
+        headers=auth_headers,
+    )
+    assert resp.get_json()["items"] == [{"name": "Home"}]
+    assert client.get("/api/zones?fields=nope", headers=auth_headers).status_code == 400